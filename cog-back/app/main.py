@@ -1,9 +1,12 @@
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse
 from .routers import load_balancer, inventory_optimizer, gemini_router
+from .services.gemini_service import get_gemini_service, close_gemini_service
+from .services.batch import gemini_batcher
+from .services.executor import get_process_pool, shutdown_process_pool
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="Smart Supply Chain Optimizer")
+app = FastAPI(title="Smart Supply Chain Optimizer", default_response_class=ORJSONResponse)
 
 # --- FIX: Updated CORS Configuration ---
 # Define the specific origins that are allowed to connect.
@@ -13,17 +16,39 @@ origins = [
     "http://localhost:3000",  # Another common local port
     # Add your deployed frontend URL here when you have it
     "https://cog-front.vercel.app",
-    "https://cog-front.vercel.app/load-balancer"
+    "https://cogni-haka.vercel.app"
 ]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"], # Allows all methods (GET, POST, etc.)
     allow_headers=["*"], # Allows all headers
+    max_age=86400, # Let browsers cache preflight responses for 24h
 )
 
+@app.on_event("startup")
+async def startup():
+    # Each uvicorn worker owns an analysis pool sized to its share of the CPUs
+    get_process_pool()
+
+    # One pooled keep-alive client for all Gemini calls; without an API key the
+    # inventory endpoints still serve and the Gemini routes report the error
+    try:
+        gemini_service = get_gemini_service()
+    except ValueError:
+        return
+    await gemini_service.start()
+    app.state.gemini_client = gemini_service.client
+    gemini_batcher.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await gemini_batcher.stop()
+    await close_gemini_service()
+    shutdown_process_pool()
+
 @app.get("/")
 @app.head("/")
 def root():
@@ -37,4 +62,18 @@ def health():
 # Routers
 app.include_router(load_balancer.router, prefix="/api")
 app.include_router(inventory_optimizer.router, prefix="/api")
-app.include_router(gemini_router.router, prefix="/api")
\ No newline at end of file
+app.include_router(gemini_router.router, prefix="/api")
+
+if __name__ == "__main__":
+    import os
+    import uvicorn
+
+    # Production entry point: `python -m app.main`. uvloop/httptools ship with uvicorn[standard]
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        loop="uvloop",
+        http="httptools"
+    )
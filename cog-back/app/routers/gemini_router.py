@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
-from app.services.gemini_service import gemini_service
+from app.services.gemini_service import get_gemini_service
+from app.services.batch import gemini_batcher
 
 router = APIRouter()
 
@@ -13,13 +15,14 @@ class GeminiResponse(BaseModel):
     response: str
     query: str
 
-@router.post("/gemini/query", response_model=GeminiResponse)
+@router.post("/gemini/query", response_model=GeminiResponse, response_class=ORJSONResponse)
 async def query_gemini(request: GeminiQuery):
     """
     Query Gemini AI with supply chain context
     """
     try:
-        response = await gemini_service.generate_response(
+        # Concurrent identical queries share one upstream call
+        response = await gemini_batcher.submit(
             request.query, 
             request.context
         )
@@ -32,7 +35,7 @@ async def query_gemini(request: GeminiQuery):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Gemini API error: {str(e)}")
 
-@router.post("/gemini/analyze-optimization")
+@router.post("/gemini/analyze-optimization", response_model=None, response_class=ORJSONResponse)
 async def analyze_optimization_with_gemini(request: Dict[str, Any]):
     """
     Get Gemini analysis of optimization results
@@ -52,9 +55,9 @@ async def analyze_optimization_with_gemini(request: Dict[str, Any]):
         3. Specific recommendations for improvement
         4. Priority actions to take"""
         
-        response = await gemini_service.generate_response(analysis_prompt, context)
+        response = await get_gemini_service().generate_response(analysis_prompt, context)
         
-        return {"analysis": response, "context": context}
+        return ORJSONResponse({"analysis": response, "context": context})
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis error: {str(e)}")
@@ -1,12 +1,21 @@
+import asyncio
+import msgspec
+import numpy as np
+from itertools import compress
+from operator import attrgetter
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Annotated, List, Optional, Dict
 from app.services.analyzer import analyze_inventory, analyze_supplier_performance
 from app.services.optimizer import optimize_inventory, optimize_production_allocation
-from app.services.forecasting import generate_demand_forecast
+from app.services.forecasting import generate_demand_forecast, plan_festival_demand
 from app.services.supply_chain import calculate_safety_stock, optimize_procurement
+from app.services.executor import get_process_pool
+from app.routers.msgspec_route import MsgspecRoute, msgspec_body
+from app.routers.streaming import json_streaming_response
 
-router = APIRouter()
+router = APIRouter(route_class=MsgspecRoute)
 
 # -------------------- ENHANCED MODELS -------------------- #
 
@@ -54,99 +63,175 @@ class OptimizationScenario(BaseModel):
     include_subcontracting: bool = Field(default=True)
     emergency_procurement: bool = Field(default=False)
 
+# -------------------- HOT-PATH STRUCTS -------------------- #
+# msgspec mirrors of the models above, used to decode request bodies.
+# The Pydantic models remain the source of the OpenAPI schema.
+
+NonNegInt = Annotated[int, msgspec.Meta(ge=0)]
+PositiveInt = Annotated[int, msgspec.Meta(ge=1)]
+NonNegFloat = Annotated[float, msgspec.Meta(ge=0)]
+UnitFloat = Annotated[float, msgspec.Meta(ge=0, le=1)]
+
+class SKUStruct(msgspec.Struct, gc=False):
+    sku: str
+    warehouse: str
+    product_category: str
+    current_stock: NonNegInt
+    forecast_demand: NonNegInt
+    actual_demand: NonNegInt
+    production_capacity: NonNegInt
+    unit_cost: NonNegFloat
+    holding_cost_rate: UnitFloat = 0.25
+    stockout_penalty: NonNegFloat = 50.0
+    lead_time_days: PositiveInt = 7
+    shelf_life_days: PositiveInt = 90
+    is_festival_sensitive: bool = False
+
+class SupplierStruct(msgspec.Struct, gc=False):
+    supplier_id: str
+    material_type: str
+    reliability_score: UnitFloat
+    lead_time_days: PositiveInt
+    moq: PositiveInt
+    unit_price: NonNegFloat
+    quality_rating: Annotated[float, msgspec.Meta(ge=0, le=10)]
+
+class ProductionConstraintStruct(msgspec.Struct, gc=False):
+    factory_location: str
+    weekly_capacity: NonNegInt
+    efficiency_rate: UnitFloat
+    production_cost_per_unit: NonNegFloat
+
+class InventoryRequestStruct(msgspec.Struct):
+    sku_data: List[SKUStruct]
+    suppliers: List[SupplierStruct] = []
+    production_constraints: List[ProductionConstraintStruct] = []
+    festival_demand_multiplier: Annotated[float, msgspec.Meta(ge=1.0, le=2.0)] = 1.45
+    service_level_target: Annotated[float, msgspec.Meta(ge=0.8, le=1.0)] = 0.95
+
+class OptimizationScenarioStruct(msgspec.Struct):
+    scenario_name: str
+    demand_surge_factor: Annotated[float, msgspec.Meta(ge=0.5, le=3.0)] = 1.0
+    capacity_utilization_target: Annotated[float, msgspec.Meta(ge=0.5, le=1.0)] = 0.85
+    include_subcontracting: bool = True
+    emergency_procurement: bool = False
+
 # -------------------- ENHANCED ROUTES -------------------- #
 
-@router.post("/analyze-supply-chain")
-def analyze_supply_chain_route(req: InventoryRequest):
+@router.post("/analyze-supply-chain", response_model=None, response_class=ORJSONResponse)
+@msgspec_body(req=InventoryRequestStruct)
+async def analyze_supply_chain_route(req: InventoryRequest):
     """Comprehensive supply chain analysis"""
     try:
-        analysis = analyze_inventory(req.sku_data)
-        supplier_analysis = analyze_supplier_performance(req.suppliers) if req.suppliers else None
-        
-        # Enhanced demand forecasting
-        demand_forecast = generate_demand_forecast(
-            req.sku_data, 
-            req.festival_demand_multiplier
-        )
-        
-        # Safety stock calculations
-        safety_stocks = calculate_safety_stock(
-            req.sku_data, 
-            req.service_level_target
-        )
-        
-        return {
-            "inventory_analysis": analysis,
-            "supplier_performance": supplier_analysis,
-            "demand_forecast": demand_forecast,
-            "safety_stock_recommendations": safety_stocks,
-            "capacity_analysis": analyze_production_capacity(req.production_constraints),
-            "risk_assessment": assess_supply_chain_risks(req.sku_data, req.suppliers)
-        }
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(get_process_pool(), run_supply_chain_analysis, req)
+        # Large per-SKU lists (e.g. ABC classification) are streamed in chunks
+        return await json_streaming_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/optimize-supply-chain")
-def optimize_supply_chain_route(req: InventoryRequest, scenario: OptimizationScenario):
+@router.post("/optimize-supply-chain", response_model=None, response_class=ORJSONResponse)
+@msgspec_body(req=InventoryRequestStruct, scenario=OptimizationScenarioStruct)
+async def optimize_supply_chain_route(req: InventoryRequest, scenario: OptimizationScenario):
     """Multi-objective supply chain optimization"""
     try:
-        # Production allocation optimization
-        production_plan = optimize_production_allocation(
-            req.sku_data, 
-            req.production_constraints,
-            scenario.capacity_utilization_target
-        )
-        
-        # Inventory optimization
-        inventory_optimization = optimize_inventory(
-            req.sku_data, 
-            req.production_constraints,
-            scenario
-        )
-        
-        # Procurement optimization
-        procurement_plan = optimize_procurement(
-            req.suppliers,
-            req.sku_data,
-            scenario.emergency_procurement
-        )
-        
-        return {
-            "production_allocation": production_plan,
-            "inventory_optimization": inventory_optimization,
-            "procurement_plan": procurement_plan,
-            "cost_analysis": calculate_total_costs(production_plan, inventory_optimization),
-            "performance_metrics": calculate_kpis(req.sku_data, inventory_optimization),
-            "recommendations": generate_strategic_recommendations(req, scenario)
-        }
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(get_process_pool(), run_supply_chain_optimization, req, scenario)
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/festival-planning")
-def festival_demand_planning(req: InventoryRequest):
+@router.post("/festival-planning", response_model=None, response_class=ORJSONResponse)
+@msgspec_body(req=InventoryRequestStruct)
+async def festival_demand_planning(req: InventoryRequest):
     """Festival demand surge planning"""
     try:
-        festival_plan = plan_festival_demand(
-            req.sku_data,
-            req.festival_demand_multiplier,
-            req.production_constraints
-        )
-        
-        return {
-            "festival_forecast": festival_plan["demand_forecast"],
-            "production_schedule": festival_plan["production_plan"],
-            "inventory_buildup": festival_plan["inventory_strategy"],
-            "subcontracting_needs": festival_plan["subcontracting"],
-            "material_requirements": festival_plan["raw_materials"],
-            "timeline": festival_plan["execution_timeline"]
-        }
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(get_process_pool(), run_festival_planning, req)
+        return ORJSONResponse(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# -------------------- WORKER ENTRY POINTS -------------------- #
+# Executed inside the analysis process pool; arguments and results must be picklable.
+# Results may contain numpy scalars, which ORJSONResponse serializes natively.
+
+def run_supply_chain_analysis(req: InventoryRequestStruct) -> Dict:
+    analysis = analyze_inventory(req.sku_data)
+    supplier_analysis = analyze_supplier_performance(req.suppliers) if req.suppliers else None
+    
+    # Enhanced demand forecasting
+    demand_forecast = generate_demand_forecast(
+        req.sku_data, 
+        req.festival_demand_multiplier
+    )
+    
+    # Safety stock calculations
+    safety_stocks = calculate_safety_stock(
+        req.sku_data, 
+        req.service_level_target
+    )
+    
+    return {
+        "inventory_analysis": analysis,
+        "supplier_performance": supplier_analysis,
+        "demand_forecast": demand_forecast,
+        "safety_stock_recommendations": safety_stocks,
+        "capacity_analysis": analyze_production_capacity(req.production_constraints),
+        "risk_assessment": assess_supply_chain_risks(req.sku_data, req.suppliers)
+    }
+
+def run_supply_chain_optimization(req: InventoryRequestStruct, scenario: OptimizationScenarioStruct) -> Dict:
+    # Production allocation optimization
+    production_plan = optimize_production_allocation(
+        req.sku_data, 
+        req.production_constraints,
+        scenario.capacity_utilization_target
+    )
+    
+    # Inventory optimization
+    inventory_optimization = optimize_inventory(
+        req.sku_data, 
+        req.production_constraints,
+        scenario
+    )
+    
+    # Procurement optimization
+    procurement_plan = optimize_procurement(
+        req.suppliers,
+        req.sku_data,
+        scenario.emergency_procurement
+    )
+    
+    return {
+        "production_allocation": production_plan,
+        "inventory_optimization": inventory_optimization,
+        "procurement_plan": procurement_plan,
+        "cost_analysis": calculate_total_costs(production_plan, inventory_optimization),
+        "performance_metrics": calculate_kpis(req.sku_data, inventory_optimization),
+        "recommendations": generate_strategic_recommendations(req, scenario)
+    }
+
+def run_festival_planning(req: InventoryRequestStruct) -> Dict:
+    festival_plan = plan_festival_demand(
+        req.sku_data,
+        req.festival_demand_multiplier,
+        req.production_constraints
+    )
+    
+    return {
+        "festival_forecast": festival_plan["demand_forecast"],
+        "production_schedule": festival_plan["production_plan"],
+        "inventory_buildup": festival_plan["inventory_strategy"],
+        "subcontracting_needs": festival_plan["subcontracting"],
+        "material_requirements": festival_plan["raw_materials"],
+        "timeline": festival_plan["execution_timeline"]
+    }
+
 # Helper functions
 def analyze_production_capacity(constraints: List[ProductionConstraint]) -> Dict:
-    total_capacity = sum(c.weekly_capacity for c in constraints)
-    avg_efficiency = sum(c.efficiency_rate for c in constraints) / len(constraints) if constraints else 0
+    total_capacity = sum(map(attrgetter('weekly_capacity'), constraints))
+    avg_efficiency = sum(map(attrgetter('efficiency_rate'), constraints)) / len(constraints) if constraints else 0
     
     return {
         "total_weekly_capacity": total_capacity,
@@ -155,8 +240,13 @@ def analyze_production_capacity(constraints: List[ProductionConstraint]) -> Dict
     }
 
 def assess_supply_chain_risks(sku_data: List[SKU], suppliers: List[Supplier]) -> Dict:
-    high_risk_skus = [sku for sku in sku_data if sku.current_stock < sku.forecast_demand * 0.5]
-    unreliable_suppliers = [s for s in suppliers if s.reliability_score < 0.8]
+    n = len(sku_data)
+    stock = np.fromiter(map(attrgetter('current_stock'), sku_data), dtype=np.int64, count=n)
+    forecast = np.fromiter(map(attrgetter('forecast_demand'), sku_data), dtype=np.int64, count=n)
+    reliability = np.fromiter(map(attrgetter('reliability_score'), suppliers), dtype=float, count=len(suppliers))
+    
+    high_risk_skus = list(compress(sku_data, stock < forecast * 0.5))
+    unreliable_suppliers = list(compress(suppliers, reliability < 0.8))
     
     return {
         "high_risk_products": len(high_risk_skus),
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List
 
@@ -19,13 +20,13 @@ class LoadBalancerRequest(BaseModel):
 
 # -------------------- ROUTES -------------------- #
 
-@router.post("/analyze-orders")
+@router.post("/analyze-orders", response_class=ORJSONResponse)
 def analyze_load_balancer(req: LoadBalancerRequest):
     """Analyze orders before running optimizer"""
     return analyze_orders([order.dict() for order in req.orders], req.stations)
 
 
-@router.post("/assign-orders")
+@router.post("/assign-orders", response_class=ORJSONResponse)
 def run_load_balancer(req: LoadBalancerRequest):
     """Run load balancing optimization"""
     return optimize_orders([order.dict() for order in req.orders], req.stations)
@@ -0,0 +1,43 @@
+import msgspec
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from typing import Any, Callable
+
+def msgspec_body(**params: Any) -> Callable:
+    """
+    Mark an endpoint whose body should be decoded by msgspec into the given Struct types.
+    The endpoint's Pydantic annotations are still used for OpenAPI docs.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__msgspec_body__ = params
+        return endpoint
+    return decorator
+
+class MsgspecRoute(APIRoute):
+    """APIRoute that skips Pydantic body validation for endpoints marked with msgspec_body"""
+
+    def get_route_handler(self) -> Callable:
+        params = getattr(self.endpoint, '__msgspec_body__', None)
+        if not params:
+            return super().get_route_handler()
+
+        endpoint = self.endpoint
+        # A single body parameter is the whole body; several are embedded by name, as in FastAPI
+        if len(params) == 1:
+            (name, body_type), = params.items()
+        else:
+            name, body_type = None, msgspec.defstruct(f"{endpoint.__name__}_body", list(params.items()))
+        decoder = msgspec.json.Decoder(body_type, strict=False)
+
+        async def handler(request: Request) -> Response:
+            try:
+                payload = decoder.decode(await request.body())
+            except (msgspec.ValidationError, msgspec.DecodeError) as e:
+                raise RequestValidationError([{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}])
+
+            if name is not None:
+                return await endpoint(**{name: payload})
+            return await endpoint(**{field: getattr(payload, field) for field in params})
+
+        return handler
@@ -0,0 +1,37 @@
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Any, Iterator
+
+# Same options ORJSONResponse uses, so streamed and buffered bodies match
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def iter_json_chunks(obj: Any, chunk_size: int = 500, depth: int = 3) -> Iterator[bytes]:
+    """
+    Serialize obj as JSON in pieces: nested dicts are emitted key by key (down to depth)
+    and long lists chunk_size records at a time; everything else in one orjson call.
+    """
+    if isinstance(obj, dict) and depth > 0:
+        yield b'{'
+        for i, (key, value) in enumerate(obj.items()):
+            yield (b',' if i else b'') + orjson.dumps(str(key)) + b':'
+            yield from iter_json_chunks(value, chunk_size, depth - 1)
+        yield b'}'
+    elif isinstance(obj, list) and len(obj) > chunk_size:
+        yield b'['
+        for start in range(0, len(obj), chunk_size):
+            chunk = obj[start:start + chunk_size]
+            body = b','.join(orjson.dumps(item, option=ORJSON_OPTIONS) for item in chunk)
+            yield (b',' if start else b'') + body
+        yield b']'
+    else:
+        yield orjson.dumps(obj, option=ORJSON_OPTIONS)
+
+async def json_streaming_response(obj: Any) -> StreamingResponse:
+    """
+    Serialize obj into chunks before the response starts, so a serialization error is
+    raised in the caller (and can become a 500) instead of truncating a 200 body.
+    """
+    # Serialized in the threadpool to keep the event loop free; only the writes are streamed
+    chunks = await run_in_threadpool(list, iter_json_chunks(obj))
+    return StreamingResponse(iter(chunks), media_type="application/json")
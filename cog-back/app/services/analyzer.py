@@ -2,6 +2,22 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
+from operator import attrgetter
+from cachetools import LFUCache
+from app.services.cache import memoize_by_payload
+from app.services.jit import njit
+
+# pyarrow is optional: when present, SKU columns are built through a RecordBatch
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Dashboards re-send the same payloads on tab switches; LFU keeps the hot ones around
+_analysis_cache = LFUCache(maxsize=128)
+
+# Shared PCG64 generator for the random baseline assignment
+_RNG = np.random.default_rng()
 
 # ----------- LOAD BALANCER ANALYZER (UNCHANGED) ----------- #
 def analyze_orders(orders, stations: int):
@@ -37,16 +53,19 @@ def analyze_orders(orders, stations: int):
     max_order = df["packingTime"].max()
 
     # Random distribution baseline (before optimization)
-    random_loads = np.random.choice(range(1, stations + 1), size=len(df))
-    df["assignedStation"] = random_loads
-
-    station_summary = (
-        df.groupby("assignedStation")
-        .agg(totalTime=("packingTime", "sum"), orders=("id", lambda x: list(x)))
-        .reset_index()
-        .rename(columns={"assignedStation": "station"})
-        .to_dict(orient="records")
-    )
+    df["assignedStation"] = _RNG.integers(1, stations + 1, size=len(df), dtype=np.int32)
+
+    station_idx = df["assignedStation"].to_numpy() - 1
+    totals = np.bincount(station_idx, weights=df["packingTime"].to_numpy(dtype=float), minlength=stations)
+    buckets = [[] for _ in range(stations)]
+    for sid, oid in zip(station_idx.tolist(), df["id"].tolist()):
+        buckets[sid].append(oid)
+
+    # Stations that drew no orders are left out, as groupby did
+    station_summary = [
+        {"station": i + 1, "totalTime": float(totals[i]), "orders": buckets[i]}
+        for i in range(stations) if buckets[i]
+    ]
 
     assignments = df[["id", "packingTime", "assignedStation"]].to_dict(orient="records")
 
@@ -71,6 +90,61 @@ def analyze_orders(orders, stations: int):
     }
 
 # ----------- ENHANCED INVENTORY ANALYZER ----------- #
+INVENTORY_FIELDS = (
+    'sku', 'warehouse', 'product_category', 'current_stock', 'forecast_demand',
+    'actual_demand', 'production_capacity', 'is_festival_sensitive'
+)
+_INVENTORY_DTYPES = (object, object, object, np.int64, np.int64, np.int64, np.int64, bool)
+
+# One C-level call returns every field of a model/Struct as a tuple
+_inventory_row = attrgetter(*INVENTORY_FIELDS)
+
+def _legacy_inventory_row(sku: Dict) -> tuple:
+    """Field tuple for a legacy dict payload (camelCase keys, no capacity/festival data)"""
+    return (
+        sku.get('sku', ''),
+        sku.get('warehouse', 'Unknown'),
+        sku.get('product_category', 'Unknown'),
+        sku.get('stock', 0),
+        sku.get('forecastDemand', 0),
+        sku.get('actualDemand', 0),
+        0,
+        False
+    )
+
+INVENTORY_SCHEMA = pa.schema([
+    ('sku', pa.string()),
+    ('warehouse', pa.string()),
+    ('product_category', pa.string()),
+    ('current_stock', pa.int64()),
+    ('forecast_demand', pa.int64()),
+    ('actual_demand', pa.int64()),
+    ('production_capacity', pa.int64()),
+    ('is_festival_sensitive', pa.bool_())
+]) if pa is not None else None
+
+def _arrow_columns(columns: List[tuple]) -> Dict[str, np.ndarray]:
+    """Columnar build via a RecordBatch, then numpy views of each column"""
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, INVENTORY_SCHEMA)],
+        schema=INVENTORY_SCHEMA
+    )
+    return {name: batch.column(name).to_numpy(zero_copy_only=False) for name in INVENTORY_FIELDS}
+
+def extract_inventory_columns(skuData: List[Any]) -> Dict[str, np.ndarray]:
+    """Extract SKU fields once into parallel numpy columns"""
+    # Payloads are uniform, so pick model attributes vs legacy dict keys once
+    get_row = _inventory_row if skuData and hasattr(skuData[0], 'sku') else _legacy_inventory_row
+    columns = list(zip(*map(get_row, skuData))) or [()] * len(INVENTORY_FIELDS)
+    if pa is not None:
+        return _arrow_columns(columns)
+
+    return {
+        name: np.array(values, dtype=dtype)
+        for name, values, dtype in zip(INVENTORY_FIELDS, columns, _INVENTORY_DTYPES)
+    }
+
+@memoize_by_payload(_analysis_cache)
 def analyze_inventory(skuData: List[Any]) -> Dict:
     """
     Enhanced inventory analysis with supply chain intelligence
@@ -83,183 +157,218 @@ def analyze_inventory(skuData: List[Any]) -> Dict:
             "insight": "No SKU data provided."
         }
 
-    # Convert to DataFrame for analysis
-    df = pd.DataFrame([
-        {
-            'sku': sku.sku if hasattr(sku, 'sku') else sku.get('sku', ''),
-            'warehouse': sku.warehouse if hasattr(sku, 'warehouse') else sku.get('warehouse', 'Unknown'),
-            'product_category': sku.product_category if hasattr(sku, 'product_category') else sku.get('product_category', 'Unknown'),
-            'current_stock': sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0),
-            'forecast_demand': sku.forecast_demand if hasattr(sku, 'forecast_demand') else sku.get('forecastDemand', 0),
-            'actual_demand': sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0),
-            'production_capacity': getattr(sku, 'production_capacity', 0),
-            'is_festival_sensitive': getattr(sku, 'is_festival_sensitive', False)
-        }
-        for sku in skuData
-    ])
+    cols = extract_inventory_columns(skuData)
+    stock = cols['current_stock']
+    forecast = cols['forecast_demand']
+    actual = cols['actual_demand']
 
     # Basic metrics
-    total_forecast = df["forecast_demand"].sum()
-    total_actual = df["actual_demand"].sum()
-    total_stock = df["current_stock"].sum()
+    total_forecast = forecast.sum()
+    total_actual = actual.sum()
+    total_stock = stock.sum()
 
     # Forecast accuracy calculation
-    df["forecast_error"] = abs(df["forecast_demand"] - df["actual_demand"])
-    forecast_accuracy = round(100 * (1 - df["forecast_error"].sum() / total_forecast), 2) if total_forecast > 0 else 100.0
+    forecast_error = np.abs(forecast - actual)
+    forecast_accuracy = round(100 * (1 - forecast_error.sum() / total_forecast), 2) if total_forecast > 0 else 100.0
 
     # Advanced analytics
-    warehouse_performance = analyze_warehouse_performance(df)
-    category_analysis = analyze_category_performance(df)
-    shortage_analysis = identify_critical_shortages(df)
-    excess_analysis = identify_excess_inventory(df)
-    demand_variability = calculate_demand_variability(df)
+    warehouse_performance = analyze_warehouse_performance(cols, forecast_error)
+    category_analysis = analyze_category_performance(cols)
+    demand_variability = calculate_demand_variability(cols, forecast_error)
     
-    # ABC Classification
-    abc_classification = perform_abc_analysis(df)
+    # Shortages, excess, service levels, stock rotation and capacity in one sweep
+    metrics = compute_all_metrics(cols)
     
-    # Service level analysis
-    service_levels = calculate_service_levels(df)
+    # ABC Classification
+    abc_classification = perform_abc_analysis(cols)
 
     return {
         "totalForecastDemand": int(total_forecast),
         "totalActualDemand": int(total_actual),
         "totalStock": int(total_stock),
         "forecastAccuracy": forecast_accuracy,
-        "criticalShortages": shortage_analysis,
-        "excessInventory": excess_analysis,
+        "criticalShortages": metrics["criticalShortages"],
+        "excessInventory": metrics["excessInventory"],
         "warehousePerformance": warehouse_performance,
         "categoryAnalysis": category_analysis,
         "demandVariability": demand_variability,
         "abcClassification": abc_classification,
-        "serviceLevels": service_levels,
-        "stockRotation": calculate_stock_rotation(df),
-        "capacityUtilization": calculate_capacity_utilization(df),
-        "insight": generate_strategic_insights(df, forecast_accuracy)
+        "serviceLevels": metrics["serviceLevels"],
+        "stockRotation": metrics["stockRotation"],
+        "capacityUtilization": metrics["capacityUtilization"],
+        "insight": generate_strategic_insights(cols, forecast_accuracy)
     }
 
-def analyze_warehouse_performance(df: pd.DataFrame) -> Dict:
+def _group_sums(labels: np.ndarray, *columns: np.ndarray):
+    """Sorted group labels plus the per-group integer sum of each column"""
+    groups, inverse = np.unique(labels, return_inverse=True)
+    sums = [
+        np.bincount(inverse, weights=column.astype(np.float64), minlength=groups.size).astype(np.int64)
+        for column in columns
+    ]
+    return groups, sums
+
+def analyze_warehouse_performance(cols: Dict[str, np.ndarray], forecast_error: np.ndarray) -> List[Dict]:
     """Analyze performance by warehouse"""
-    warehouse_stats = df.groupby('warehouse').agg({
-        'current_stock': 'sum',
-        'forecast_demand': 'sum',
-        'actual_demand': 'sum',
-        'forecast_error': 'sum'
-    }).reset_index()
-    
-    warehouse_stats['stock_coverage'] = (
-        warehouse_stats['current_stock'] / warehouse_stats['actual_demand']
-    ).round(2)
+    warehouses, (stock, forecast, actual, error) = _group_sums(
+        cols['warehouse'], cols['current_stock'], cols['forecast_demand'], cols['actual_demand'], forecast_error
+    )
     
-    warehouse_stats['forecast_accuracy'] = (
-        100 * (1 - warehouse_stats['forecast_error'] / warehouse_stats['forecast_demand'])
-    ).round(2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stock_coverage = (stock / actual).round(2)
+        forecast_accuracy = (100 * (1 - error / forecast)).round(2)
     
-    return warehouse_stats.to_dict('records')
+    return [
+        {
+            'warehouse': warehouse,
+            'current_stock': int(stock[i]),
+            'forecast_demand': int(forecast[i]),
+            'actual_demand': int(actual[i]),
+            'forecast_error': int(error[i]),
+            'stock_coverage': float(stock_coverage[i]),
+            'forecast_accuracy': float(forecast_accuracy[i])
+        }
+        for i, warehouse in enumerate(warehouses.tolist())
+    ]
 
-def analyze_category_performance(df: pd.DataFrame) -> Dict:
+def analyze_category_performance(cols: Dict[str, np.ndarray]) -> List[Dict]:
     """Analyze performance by product category"""
-    category_stats = df.groupby('product_category').agg({
-        'current_stock': 'sum',
-        'forecast_demand': 'sum',
-        'actual_demand': 'sum',
-        'production_capacity': 'sum'
-    }).reset_index()
+    categories, (stock, forecast, actual, capacity) = _group_sums(
+        cols['product_category'], cols['current_stock'], cols['forecast_demand'],
+        cols['actual_demand'], cols['production_capacity']
+    )
     
-    category_stats['capacity_utilization'] = (
-        category_stats['actual_demand'] / category_stats['production_capacity'] * 100
-    ).round(2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_utilization = (actual / capacity * 100).round(2)
     
-    return category_stats.to_dict('records')
+    return [
+        {
+            'product_category': category,
+            'current_stock': int(stock[i]),
+            'forecast_demand': int(forecast[i]),
+            'actual_demand': int(actual[i]),
+            'production_capacity': int(capacity[i]),
+            'capacity_utilization': float(capacity_utilization[i])
+        }
+        for i, category in enumerate(categories.tolist())
+    ]
 
-def identify_critical_shortages(df: pd.DataFrame) -> List[Dict]:
-    """Identify products with critical shortages"""
-    shortage_threshold = 0.2  # 20% of demand
-    critical = df[df['current_stock'] < df['actual_demand'] * shortage_threshold]
-    
-    return critical[['sku', 'warehouse', 'current_stock', 'actual_demand']].to_dict('records')
+def _stock_records(cols: Dict[str, np.ndarray], mask: np.ndarray) -> List[Dict]:
+    """SKU stock records for the rows selected by mask"""
+    return [
+        {'sku': sku, 'warehouse': warehouse, 'current_stock': stock, 'actual_demand': demand}
+        for sku, warehouse, stock, demand in zip(
+            cols['sku'][mask].tolist(),
+            cols['warehouse'][mask].tolist(),
+            cols['current_stock'][mask].tolist(),
+            cols['actual_demand'][mask].tolist()
+        )
+    ]
 
-def identify_excess_inventory(df: pd.DataFrame) -> List[Dict]:
-    """Identify products with excess inventory"""
-    excess_threshold = 2.0  # 200% of demand
-    excess = df[df['current_stock'] > df['actual_demand'] * excess_threshold]
-    
-    return excess[['sku', 'warehouse', 'current_stock', 'actual_demand']].to_dict('records')
+def _group_means(labels: np.ndarray, values: np.ndarray) -> Dict:
+    """Per-label mean of values, skipping NaN like pandas groupby().mean()"""
+    groups, inverse = np.unique(labels, return_inverse=True)
+    valid = ~np.isnan(values)
+    sums = np.bincount(inverse, weights=np.where(valid, values, 0.0), minlength=groups.size)
+    counts = np.bincount(inverse, weights=valid, minlength=groups.size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = (sums / counts).round(2)
+    return dict(zip(groups.tolist(), means.tolist()))
 
-def calculate_demand_variability(df: pd.DataFrame) -> Dict:
-    """Calculate demand variability metrics"""
-    df['demand_variance'] = abs(df['forecast_demand'] - df['actual_demand'])
-    df['cv'] = df['demand_variance'] / df['forecast_demand']  # Coefficient of variation
-    
-    return {
-        'averageVariability': df['cv'].mean().round(4),
-        'highVariabilityProducts': df[df['cv'] > 0.3]['sku'].tolist(),
-        'stableProducts': df[df['cv'] < 0.1]['sku'].tolist()
-    }
+def compute_all_metrics(cols: Dict[str, np.ndarray]) -> Dict:
+    """Shortage, excess, service level, stock rotation and capacity metrics from one read of the columns"""
+    sku = cols['sku']
+    stock = cols['current_stock']
+    actual = cols['actual_demand']
+    capacity = cols['production_capacity']
 
-def perform_abc_analysis(df: pd.DataFrame) -> Dict:
-    """Perform ABC analysis based on demand value"""
-    df['demand_value'] = df['actual_demand'] * 100  # Assuming unit value
-    df_sorted = df.sort_values('demand_value', ascending=False)
-    
-    total_value = df_sorted['demand_value'].sum()
-    df_sorted['cumulative_value'] = df_sorted['demand_value'].cumsum()
-    df_sorted['cumulative_percentage'] = (df_sorted['cumulative_value'] / total_value * 100).round(2)
-    
-    # Classify items
-    df_sorted['abc_class'] = 'C'
-    df_sorted.loc[df_sorted['cumulative_percentage'] <= 80, 'abc_class'] = 'A'
-    df_sorted.loc[(df_sorted['cumulative_percentage'] > 80) & (df_sorted['cumulative_percentage'] <= 95), 'abc_class'] = 'B'
-    
-    abc_summary = df_sorted.groupby('abc_class').agg({
-        'sku': 'count',
-        'demand_value': 'sum'
-    }).reset_index()
-    
-    return {
-        'classification': df_sorted[['sku', 'abc_class', 'cumulative_percentage']].to_dict('records'),
-        'summary': abc_summary.to_dict('records')
-    }
+    shortage_mask = stock < actual * 0.2  # 20% of demand
+    excess_mask = stock > actual * 2.0  # 200% of demand
+    capacity_mask = actual > capacity
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        service_level = np.minimum(stock / actual, 1.0) * 100
+        stock_turns = actual / stock
+        days_of_stock = 365 / stock_turns
+
+    total_capacity = capacity.sum()
+    total_demand = actual.sum()
+    utilization = (total_demand / total_capacity * 100) if total_capacity > 0 else 0
 
-def calculate_service_levels(df: pd.DataFrame) -> Dict:
-    """Calculate service levels by warehouse and category"""
-    df['service_level'] = np.minimum(df['current_stock'] / df['actual_demand'], 1.0) * 100
-    
-    warehouse_service = df.groupby('warehouse')['service_level'].mean().round(2).to_dict()
-    category_service = df.groupby('product_category')['service_level'].mean().round(2).to_dict()
-    
     return {
-        'byWarehouse': warehouse_service,
-        'byCategory': category_service,
-        'overall': df['service_level'].mean().round(2)
+        'criticalShortages': _stock_records(cols, shortage_mask),
+        'excessInventory': _stock_records(cols, excess_mask),
+        'serviceLevels': {
+            'byWarehouse': _group_means(cols['warehouse'], service_level),
+            'byCategory': _group_means(cols['product_category'], service_level),
+            'overall': np.nanmean(service_level).round(2)
+        },
+        'stockRotation': {
+            'averageStockTurns': np.nanmean(stock_turns).round(2),
+            'averageDaysOfStock': np.nanmean(days_of_stock).round(0),
+            'slowMovingProducts': sku[days_of_stock > 180].tolist()
+        },
+        'capacityUtilization': {
+            'overallUtilization': round(utilization, 2),
+            'underUtilizedCapacity': max(0, total_capacity - total_demand),
+            'capacityConstraints': sku[capacity_mask].tolist()
+        }
     }
 
-def calculate_stock_rotation(df: pd.DataFrame) -> Dict:
-    """Calculate stock rotation metrics"""
-    df['stock_turns'] = df['actual_demand'] / df['current_stock']
-    df['days_of_stock'] = 365 / df['stock_turns']
+def calculate_demand_variability(cols: Dict[str, np.ndarray], demand_variance: np.ndarray) -> Dict:
+    """Calculate demand variability metrics"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = demand_variance / cols['forecast_demand']  # Coefficient of variation
     
     return {
-        'averageStockTurns': df['stock_turns'].mean().round(2),
-        'averageDaysOfStock': df['days_of_stock'].mean().round(0),
-        'slowMovingProducts': df[df['days_of_stock'] > 180]['sku'].tolist()
+        'averageVariability': np.nanmean(cv).round(4),
+        'highVariabilityProducts': cols['sku'][cv > 0.3].tolist(),
+        'stableProducts': cols['sku'][cv < 0.1].tolist()
     }
 
-def calculate_capacity_utilization(df: pd.DataFrame) -> Dict:
-    """Calculate production capacity utilization"""
-    total_capacity = df['production_capacity'].sum()
-    total_demand = df['actual_demand'].sum()
+@njit(cache=True, error_model='numpy')
+def _abc_kernel(demand_value: np.ndarray):
+    """Sort demand value descending and classify by cumulative share (0=A, 1=B, 2=C)"""
+    order = np.argsort(-demand_value, kind='mergesort')
+    total = demand_value.sum()
+    cumulative_percentage = np.empty(demand_value.size)
+    abc = np.empty(demand_value.size, dtype=np.int8)
+    
+    cumulative = 0.0
+    for k in range(demand_value.size):
+        cumulative += demand_value[order[k]]
+        pct = np.round(cumulative / total * 100, 2)
+        cumulative_percentage[k] = pct
+        abc[k] = 0 if pct <= 80 else (1 if pct <= 95 else 2)
+    
+    return order, cumulative_percentage, abc
+
+_ABC_LABELS = ('A', 'B', 'C')
+
+def perform_abc_analysis(cols: Dict[str, np.ndarray]) -> Dict:
+    """Perform ABC analysis based on demand value"""
+    demand_value = cols['actual_demand'] * 100  # Assuming unit value
+    order, cumulative_percentage, abc = _abc_kernel(demand_value.astype(np.float64))
     
-    utilization = (total_demand / total_capacity * 100) if total_capacity > 0 else 0
+    counts = np.bincount(abc, minlength=3)
+    values = np.bincount(abc, weights=demand_value[order], minlength=3).astype(np.int64)
     
     return {
-        'overallUtilization': round(utilization, 2),
-        'underUtilizedCapacity': max(0, total_capacity - total_demand),
-        'capacityConstraints': df[df['actual_demand'] > df['production_capacity']]['sku'].tolist()
+        'classification': [
+            {'sku': sku, 'abc_class': _ABC_LABELS[cls], 'cumulative_percentage': pct}
+            for sku, cls, pct in zip(cols['sku'][order].tolist(), abc.tolist(), cumulative_percentage.tolist())
+        ],
+        'summary': [
+            {'abc_class': _ABC_LABELS[cls], 'sku': int(counts[cls]), 'demand_value': int(values[cls])}
+            for cls in range(3) if counts[cls] > 0
+        ]
     }
 
-def generate_strategic_insights(df: pd.DataFrame, forecast_accuracy: float) -> List[str]:
+def generate_strategic_insights(cols: Dict[str, np.ndarray], forecast_accuracy: float) -> List[str]:
     """Generate strategic insights from the analysis"""
     insights = []
+    stock = cols['current_stock']
+    actual = cols['actual_demand']
     
     # Forecast accuracy insights
     if forecast_accuracy < 70:
@@ -268,22 +377,22 @@ def generate_strategic_insights(df: pd.DataFrame, forecast_accuracy: float) -> L
         insights.append("Excellent forecast accuracy. Current forecasting methods are performing well.")
     
     # Capacity insights
-    capacity_constrained = len(df[df['actual_demand'] > df['production_capacity']])
+    capacity_constrained = int(np.count_nonzero(actual > cols['production_capacity']))
     if capacity_constrained > 0:
         insights.append(f"{capacity_constrained} products facing capacity constraints. Consider production optimization.")
     
     # Stock insights
-    shortage_count = len(df[df['current_stock'] < df['actual_demand'] * 0.5])
+    shortage_count = int(np.count_nonzero(stock < actual * 0.5))
     if shortage_count > 0:
         insights.append(f"{shortage_count} products at risk of stockout. Implement safety stock policies.")
     
     # Warehouse insights
-    mumbai_performance = df[df['warehouse'] == 'Mumbai']
-    if len(mumbai_performance) > 0 and (mumbai_performance['current_stock'] < mumbai_performance['actual_demand']).any():
+    if ((cols['warehouse'] == 'Mumbai') & (stock < actual)).any():
         insights.append("Mumbai warehouse showing stock shortage patterns. Consider inventory redistribution.")
     
     return insights
 
+@memoize_by_payload(_analysis_cache)
 def analyze_supplier_performance(suppliers: List[Any]) -> Dict:
     """Analyze supplier performance and reliability"""
     if not suppliers:
@@ -303,19 +412,24 @@ def analyze_supplier_performance(suppliers: List[Any]) -> Dict:
     ])
     
     # Calculate supplier rankings
-    supplier_df['overall_score'] = (
-        supplier_df['reliability_score'] * 0.4 +
-        (supplier_df['quality_rating'] / 10) * 0.3 +
-        (1 / supplier_df['lead_time_days']) * 0.2 +
-        (1 / supplier_df['unit_price']) * 0.1
+    # Lead time and price are floored so zero values can't produce inf scores
+    lead = supplier_df['lead_time_days'].to_numpy(dtype=float)
+    price = supplier_df['unit_price'].to_numpy(dtype=float)
+    score = (
+        supplier_df['reliability_score'].to_numpy(dtype=float) * 0.4 +
+        supplier_df['quality_rating'].to_numpy(dtype=float) * 0.03 +
+        np.reciprocal(np.maximum(lead, 1.0)) * 0.2 +
+        np.reciprocal(np.maximum(price, 1e-9)) * 0.1
     )
+    supplier_df['overall_score'] = score
+    ranking = np.argsort(-score, kind='stable')
     
     # Identify problematic suppliers
     unreliable_suppliers = supplier_df[supplier_df['reliability_score'] < 0.8]
     high_lead_time = supplier_df[supplier_df['lead_time_days'] > 14]
     
     return {
-        'supplierRankings': supplier_df.sort_values('overall_score', ascending=False).to_dict('records'),
+        'supplierRankings': supplier_df.iloc[ranking].to_dict('records'),
         'unreliableSuppliers': unreliable_suppliers['supplier_id'].tolist(),
         'highLeadTimeSuppliers': high_lead_time['supplier_id'].tolist(),
         'averageReliability': supplier_df['reliability_score'].mean().round(3),
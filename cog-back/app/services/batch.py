@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.gemini_service import GeminiService, get_gemini_service, response_cache_key
+
+QueueItem = Tuple[str, Optional[Dict[str, Any]], asyncio.Future]
+
+async def collect_batch(queue: asyncio.Queue, max_size: int, max_wait: float) -> List[QueueItem]:
+    """Wait for one item, then keep collecting until max_size items or max_wait seconds"""
+    loop = asyncio.get_running_loop()
+    items = [await queue.get()]
+    deadline = loop.time() + max_wait
+
+    while len(items) < max_size:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            items.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+
+    return items
+
+class GeminiBatcher:
+    """
+    Coalesces concurrent identical Gemini queries into one upstream call.
+    Distinct (query, context) pairs never share a prompt, so no caller's context or
+    query reaches another caller's answer; at most max_concurrent_calls are in flight.
+    """
+
+    def __init__(self, service: Optional[GeminiService] = None, max_batch_size: int = 32, max_wait: float = 0.02,
+                 max_concurrent_calls: int = 8):
+        self._service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_calls = max_concurrent_calls
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    @property
+    def service(self) -> GeminiService:
+        # Resolved on first dispatch; defaults to the shared service
+        if self._service is None:
+            self._service = get_gemini_service()
+        return self._service
+
+    def start(self) -> None:
+        if self.worker_task is None:
+            self.queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+            self.worker_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.worker_task is None:
+            return
+        self.worker_task.cancel()
+        await asyncio.gather(self.worker_task, *self._inflight, return_exceptions=True)
+        self.worker_task = None
+
+    async def submit(self, query: str, context: Optional[Dict[str, Any]] = None) -> str:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, context, future))
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            items = await collect_batch(self.queue, self.max_batch_size, self.max_wait)
+            waiters: Dict[str, Tuple[str, Optional[Dict[str, Any]], List[asyncio.Future]]] = {}
+            for query, context, future in items:
+                waiters.setdefault(response_cache_key(query, context), (query, context, []))[2].append(future)
+
+            for query, context, futures in waiters.values():
+                task = asyncio.create_task(self._dispatch(query, context, futures))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, query: str, context: Optional[Dict[str, Any]], futures: List[asyncio.Future]) -> None:
+        async with self._semaphore:
+            try:
+                response = await self.service.generate_response(query, context)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        for future in futures:
+            if not future.done():
+                future.set_result(response)
+
+gemini_batcher = GeminiBatcher()
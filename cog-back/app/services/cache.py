@@ -0,0 +1,50 @@
+import threading
+from functools import wraps
+from hashlib import blake2b
+from typing import Any, Callable, List, Optional
+
+import msgspec
+import orjson
+
+# Payloads above this size are not worth hashing/retaining
+MAX_CACHED_ITEMS = 50_000
+
+def payload_digest(items: List[Any]) -> Optional[bytes]:
+    """Stable digest of a list of request models/dicts, or None if not serializable"""
+    try:
+        payload = orjson.dumps(
+            [item.model_dump() if hasattr(item, 'model_dump') else msgspec.to_builtins(item) for item in items],
+            option=orjson.OPT_SORT_KEYS
+        )
+    except TypeError:
+        return None
+    return blake2b(payload).digest()
+
+def memoize_by_payload(cache) -> Callable:
+    """Memoize an analysis function keyed by its payload digest plus any scalar arguments"""
+    lock = threading.Lock()
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(items: List[Any], *args, **kwargs):
+            if not items or len(items) > MAX_CACHED_ITEMS:
+                return func(items, *args, **kwargs)
+
+            digest = payload_digest(items)
+            if digest is None:
+                return func(items, *args, **kwargs)
+
+            key = (func.__name__, digest, args, tuple(sorted(kwargs.items())))
+            with lock:
+                cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+            result = func(items, *args, **kwargs)
+            with lock:
+                cache[key] = result
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,24 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Shared worker pool for CPU-heavy analysis so async routes never block the event loop.
+# Started by the app's startup hook; every uvicorn worker owns one, so the CPUs are split between them
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def process_pool_size() -> int:
+    """Analysis processes per uvicorn worker: cpu_count // WEB_CONCURRENCY, at least one"""
+    return max(1, (os.cpu_count() or 1) // max(1, int(os.getenv("WEB_CONCURRENCY", "4"))))
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The worker's analysis pool, started on first use if the startup hook has not run"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=process_pool_size())
+    return _process_pool
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
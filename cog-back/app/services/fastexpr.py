@@ -0,0 +1,17 @@
+import numpy as np
+from typing import Dict
+
+# NumExpr is optional: without it the same expressions are evaluated with NumPy
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+_NUMPY_FUNCTIONS = {'where': np.where, 'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log}
+
+def evaluate(expr: str, local_dict: Dict[str, np.ndarray]) -> np.ndarray:
+    """Evaluate an elementwise array expression in one fused pass when NumExpr is installed"""
+    if NUMEXPR_AVAILABLE:
+        return ne.evaluate(expr, local_dict=local_dict)
+    return eval(expr, {'__builtins__': {}, **_NUMPY_FUNCTIONS}, local_dict)
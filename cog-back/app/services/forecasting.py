@@ -1,13 +1,98 @@
+import os
+import stat
+import joblib
 import numpy as np
+import orjson
 import pandas as pd
-from typing import List, Dict, Any
+from hashlib import blake2b
+from operator import attrgetter
+from types import MappingProxyType
+from typing import List, Dict, Any, FrozenSet, Optional
 from datetime import datetime, timedelta
 from sklearn.ensemble import RandomForestRegressor
 from scipy import stats
+from cachetools import LRUCache, TTLCache
+from app.services.cache import memoize_by_payload
+from app.services.fastexpr import evaluate
+from app.services.jit import njit
 import warnings
 warnings.filterwarnings('ignore')
 
-def generate_demand_forecast(sku_data: List[Any], festival_multiplier: float = 1.45) -> Dict:
+# ONNX Runtime inference is opt-in (FORECAST_USE_ONNX=1) and needs skl2onnx + onnxruntime
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+USE_ONNX = ONNX_AVAILABLE and os.getenv("FORECAST_USE_ONNX", "0") == "1"
+ONNX_MIN_ROWS = 1000  # Below this, converting the model costs more than sklearn inference
+
+# Below this many SKUs the NumPy paths win over calling into (and compiling) the JIT kernels
+JIT_MIN_ROWS = 1000
+
+# Re-runs of the same scenario from the UI reuse the forecast for a few minutes
+_forecast_cache = TTLCache(maxsize=64, ttl=300)
+
+# Fitted forests are reused per SKU catalog. Persisting them so warm starts survive restarts is
+# opt-in: FORECAST_MODEL_DIR must name a directory only this user can write to (it is unpickled)
+FORECAST_MODEL_VERSION = 1  # Bump whenever the ML feature matrix changes
+FORECAST_MODEL_DIR = os.getenv("FORECAST_MODEL_DIR")
+_model_cache = LRUCache(maxsize=32)
+
+# Forests are fit inside the analysis processes, which already split the CPUs between them,
+# so trees train single-threaded unless FORECAST_FOREST_JOBS says otherwise
+FOREST_JOBS = max(1, int(os.getenv("FORECAST_FOREST_JOBS", "1")))
+
+# Converted models, keyed like _model_cache
+_onnx_sessions = LRUCache(maxsize=16)
+
+# Quarterly demand factors per product category (read-only, shared by every request)
+SEASONAL_FACTORS = MappingProxyType({
+    'Snacks': MappingProxyType({
+        'Q1': 0.9, 'Q2': 1.1, 'Q3': 1.2, 'Q4': 0.8,
+        'festival_boost': 1.5
+    }),
+    'Beverages': MappingProxyType({
+        'Q1': 0.8, 'Q2': 1.3, 'Q3': 1.4, 'Q4': 0.5,
+        'festival_boost': 1.2
+    }),
+    'Unknown': MappingProxyType({
+        'Q1': 1.0, 'Q2': 1.0, 'Q3': 1.0, 'Q4': 1.0,
+        'festival_boost': 1.3
+    })
+})
+
+# Simplified raw material usage per unit of festival demand (would be more complex in reality)
+MATERIAL_MAP = MappingProxyType({
+    'Snacks': MappingProxyType({'flour': 0.6, 'oil': 0.2, 'seasoning': 0.1}),
+    'Beverages': MappingProxyType({'water': 0.8, 'concentrate': 0.15, 'packaging': 0.05}),
+    'Unknown': MappingProxyType({'raw_material': 0.5, 'packaging': 0.3})
+})
+MATERIAL_CATEGORIES = tuple(MATERIAL_MAP)
+UNKNOWN_MATERIAL_CATEGORY = MATERIAL_CATEGORIES.index('Unknown')
+MATERIALS = tuple(dict.fromkeys(material for ratios in MATERIAL_MAP.values() for material in ratios))
+# Material ratio per unit of festival demand, (category, material)
+MATERIAL_RATIOS = np.array([[ratios.get(material, 0.0) for material in MATERIALS] for ratios in MATERIAL_MAP.values()])
+_MATERIAL_CATEGORY_INDEX = {category: i for i, category in enumerate(MATERIAL_CATEGORIES)}
+
+# Keys of a full forecast response
+FORECAST_COMPONENTS = frozenset({
+    'baseForecast', 'festivalAdjusted', 'mlForecast', 'ensembleForecast', 'seasonalPatterns',
+    'confidenceIntervals', 'forecastAccuracy', 'demandVolatility', 'recommendations'
+})
+
+# Outputs that need the ensemble, and with it the ML forecast
+_ENSEMBLE_COMPONENTS = frozenset({'ensembleForecast', 'confidenceIntervals', 'recommendations'})
+
+# What festival planning reports from the forecast
+FESTIVAL_FORECAST_COMPONENTS = frozenset({'festivalAdjusted', 'ensembleForecast'})
+
+@memoize_by_payload(_forecast_cache)
+def generate_demand_forecast(sku_data: List[Any], festival_multiplier: float = 1.45,
+                             components: Optional[FrozenSet[str]] = None) -> Dict:
     """
     Generate demand forecasts using multiple methods including festival surge prediction
     """
@@ -15,107 +100,134 @@ def generate_demand_forecast(sku_data: List[Any], festival_multiplier: float = 1
         return {"message": "No SKU data provided"}
     
     # Convert to DataFrame
-    df = pd.DataFrame([
-        {
-            'sku': sku.sku if hasattr(sku, 'sku') else sku.get('sku', ''),
-            'warehouse': sku.warehouse if hasattr(sku, 'warehouse') else sku.get('warehouse', 'Delhi'),
-            'current_stock': sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0),
-            'forecast_demand': sku.forecast_demand if hasattr(sku, 'forecast_demand') else sku.get('forecastDemand', 0),
-            'actual_demand': sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0),
-            'is_festival_sensitive': getattr(sku, 'is_festival_sensitive', False),
-            'product_category': getattr(sku, 'product_category', 'Unknown')
-        }
-        for sku in sku_data
-    ])
+    df = build_sku_frame(sku_data)
+    return forecast_from_frame(df, festival_multiplier, components)
+
+def forecast_from_frame(df: pd.DataFrame, festival_multiplier: float,
+                        components: Optional[FrozenSet[str]] = None) -> Dict:
+    """
+    Forecast from an already-built SKU frame. Only the requested components
+    (all of FORECAST_COMPONENTS by default) are computed and returned.
+    """
+    wanted = FORECAST_COMPONENTS if components is None else components
+    result = {}
+    
+    # Error columns shared by the confidence, accuracy, volatility and recommendation steps
+    add_forecast_error_columns(df)
     
-    # Generate time series forecasts
+    # Generate time series forecasts; every stage returns a frame aligned row-for-row with df
     base_forecasts = generate_base_forecasts(df)
-    seasonal_adjustments = calculate_seasonal_patterns(df)
     festival_forecasts = apply_festival_surge(base_forecasts, df, festival_multiplier)
+    if 'baseForecast' in wanted:
+        result["baseForecast"] = base_forecasts.to_dict('records')
+    if 'festivalAdjusted' in wanted:
+        result["festivalAdjusted"] = festival_forecasts.to_dict('records')
+    
+    # ML-based demand sensing is the expensive step; skip it unless something uses it
+    if 'mlForecast' in wanted or wanted & _ENSEMBLE_COMPONENTS:
+        ml_forecasts = machine_learning_forecast(df)
+        if 'mlForecast' in wanted:
+            result["mlForecast"] = ml_forecasts.to_dict('records')
+        
+        # Ensemble forecast combining multiple methods
+        ensemble_forecasts = create_ensemble_forecast(base_forecasts, festival_forecasts, ml_forecasts)
+        if 'ensembleForecast' in wanted:
+            result["ensembleForecast"] = ensemble_records(ensemble_forecasts)
     
-    # ML-based demand sensing
-    ml_forecasts = machine_learning_forecast(df)
-    
-    # Ensemble forecast combining multiple methods
-    ensemble_forecasts = create_ensemble_forecast(base_forecasts, festival_forecasts, ml_forecasts)
+    if 'seasonalPatterns' in wanted:
+        result["seasonalPatterns"] = calculate_seasonal_patterns(df)
     
     # Calculate forecast confidence intervals
-    confidence_intervals = calculate_forecast_confidence(df, ensemble_forecasts)
+    if 'confidenceIntervals' in wanted:
+        result["confidenceIntervals"] = calculate_forecast_confidence(df, ensemble_forecasts).to_dict('records')
+    if 'forecastAccuracy' in wanted:
+        result["forecastAccuracy"] = calculate_forecast_accuracy(df)
+    if 'demandVolatility' in wanted:
+        result["demandVolatility"] = calculate_demand_volatility(df)
+    if 'recommendations' in wanted:
+        # Reuse the volatility bucketing when it was just done
+        volatility = result.get("demandVolatility")
+        rec_stats = forecast_recommendation_stats(
+            df, len(volatility['volatileProducts']) if volatility and 'volatileProducts' in volatility else None
+        )
+        result["recommendations"] = generate_forecast_recommendations(df, ensemble_forecasts, rec_stats)
     
-    return {
-        "baseForecast": base_forecasts,
-        "festivalAdjusted": festival_forecasts,
-        "mlForecast": ml_forecasts,
-        "ensembleForecast": ensemble_forecasts,
-        "seasonalPatterns": seasonal_adjustments,
-        "confidenceIntervals": confidence_intervals,
-        "forecastAccuracy": calculate_forecast_accuracy(df),
-        "demandVolatility": calculate_demand_volatility(df),
-        "recommendations": generate_forecast_recommendations(df, ensemble_forecasts)
-    }
+    return result
+
+SKU_FRAME_COLUMNS = [
+    'sku', 'warehouse', 'current_stock', 'forecast_demand', 'actual_demand',
+    'is_festival_sensitive', 'product_category'
+]
+
+def _legacy_sku_row(sku: Dict) -> tuple:
+    """Frame row for a legacy dict payload (camelCase keys, no festival/category data)"""
+    return (
+        sku.get('sku', ''),
+        sku.get('warehouse', 'Delhi'),
+        sku.get('stock', 0),
+        sku.get('forecastDemand', 0),
+        sku.get('actualDemand', 0),
+        False,
+        'Unknown'
+    )
+
+def build_sku_frame(sku_data: List[Any]) -> pd.DataFrame:
+    """Normalize SKU models or legacy dicts into the forecasting DataFrame"""
+    # Payloads are uniform, so pick model attributes vs legacy dict keys once
+    get_row = attrgetter(*SKU_FRAME_COLUMNS) if sku_data and hasattr(sku_data[0], 'sku') else _legacy_sku_row
+    df = pd.DataFrame(list(map(get_row, sku_data)), columns=SKU_FRAME_COLUMNS)
+    df['warehouse'] = df['warehouse'].astype('category')
+    df['product_category'] = df['product_category'].astype('category')
+    return df
 
-def generate_base_forecasts(df: pd.DataFrame) -> List[Dict]:
+def add_forecast_error_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Attach forecast_error, mape and demand_cv columns, computed once per forecast run"""
+    forecast_demand = df['forecast_demand'].to_numpy()
+    actual_demand = df['actual_demand'].to_numpy()
+    forecast_error = np.abs(forecast_demand - actual_demand)
+    
+    df['forecast_error'] = forecast_error
+    df['mape'] = forecast_error / np.maximum(actual_demand, 1) * 100
+    df['demand_cv'] = forecast_error / np.maximum(forecast_demand, 1)
+    return df
+
+def generate_base_forecasts(df: pd.DataFrame) -> pd.DataFrame:
     """Generate base forecasts using trend analysis"""
-    forecasts = []
+    current_demand = df['actual_demand'].to_numpy(dtype=float)
+    forecast_demand = df['forecast_demand'].to_numpy(dtype=float)
     
-    for _, row in df.iterrows():
-        # Simple trend analysis
-        current_demand = row['actual_demand']
-        forecast_demand = row['forecast_demand']
-        
-        # Calculate trend
-        if forecast_demand > 0:
-            trend_factor = current_demand / forecast_demand
-        else:
-            trend_factor = 1.0
-        
-        # Project next period demand
-        next_period_base = current_demand * trend_factor
-        
-        # Apply smoothing
-        smoothed_forecast = 0.7 * current_demand + 0.3 * forecast_demand
-        
-        forecasts.append({
-            'sku': row['sku'],
-            'warehouse': row['warehouse'],
-            'baseForecast': round(smoothed_forecast, 0),
-            'trendFactor': round(trend_factor, 3),
-            'nextPeriodForecast': round(next_period_base, 0)
-        })
+    # Calculate trend (flat when there is no forecast to compare against)
+    has_forecast = forecast_demand > 0
+    trend_factor = np.where(has_forecast, current_demand / np.where(has_forecast, forecast_demand, 1.0), 1.0)
+    
+    # Project next period demand
+    next_period_base = current_demand * trend_factor
     
-    return forecasts
+    # Apply smoothing
+    smoothed_forecast = 0.7 * current_demand + 0.3 * forecast_demand
+    
+    return df[['sku', 'warehouse']].assign(
+        baseForecast=np.round(smoothed_forecast, 0),
+        trendFactor=np.round(trend_factor, 3),
+        nextPeriodForecast=np.round(next_period_base, 0)
+    )
 
 def calculate_seasonal_patterns(df: pd.DataFrame) -> Dict:
     """Calculate seasonal demand patterns"""
-    # Simulate seasonal patterns based on product categories
-    seasonal_factors = {
-        'Snacks': {
-            'Q1': 0.9, 'Q2': 1.1, 'Q3': 1.2, 'Q4': 0.8,
-            'festival_boost': 1.5
-        },
-        'Beverages': {
-            'Q1': 0.8, 'Q2': 1.3, 'Q3': 1.4, 'Q4': 0.5,
-            'festival_boost': 1.2
-        },
-        'Unknown': {
-            'Q1': 1.0, 'Q2': 1.0, 'Q3': 1.0, 'Q4': 1.0,
-            'festival_boost': 1.3
-        }
-    }
-    
     # Current quarter (assuming Q3 for September)
     current_quarter = 'Q3'
     
     patterns = {}
     for category in df['product_category'].unique():
-        if category in seasonal_factors:
+        factors = SEASONAL_FACTORS.get(category)
+        if factors is not None:
             patterns[category] = {
-                'currentSeasonality': seasonal_factors[category][current_quarter],
-                'festivalImpact': seasonal_factors[category]['festival_boost'],
-                'yearlyPattern': seasonal_factors[category]
+                'currentSeasonality': factors[current_quarter],
+                'festivalImpact': factors['festival_boost'],
+                'yearlyPattern': dict(factors)
             }
         else:
-            patterns[category] = patterns.get('Unknown', seasonal_factors['Unknown'])
+            patterns[category] = patterns.get('Unknown', dict(SEASONAL_FACTORS['Unknown']))
     
     return {
         'patterns': patterns,
@@ -124,174 +236,217 @@ def calculate_seasonal_patterns(df: pd.DataFrame) -> Dict:
         'lowSeason': 'Q4'
     }
 
-def apply_festival_surge(base_forecasts: List[Dict], df: pd.DataFrame, festival_multiplier: float) -> List[Dict]:
+def apply_festival_surge(base_forecasts: pd.DataFrame, df: pd.DataFrame, festival_multiplier: float) -> pd.DataFrame:
     """Apply festival surge adjustments to base forecasts"""
-    festival_forecasts = []
-    
-    for forecast in base_forecasts:
-        sku_row = df[df['sku'] == forecast['sku']].iloc[0]
-        is_festival_sensitive = sku_row['is_festival_sensitive']
-        
-        if is_festival_sensitive:
-            festival_demand = forecast['baseForecast'] * festival_multiplier
-            surge_factor = festival_multiplier
-        else:
-            # Non-festival sensitive products get minimal boost
-            festival_demand = forecast['baseForecast'] * 1.1
-            surge_factor = 1.1
-        
-        festival_forecasts.append({
-            'sku': forecast['sku'],
-            'warehouse': forecast['warehouse'],
-            'festivalForecast': round(festival_demand, 0),
-            'surgeFactor': round(surge_factor, 2),
-            'isFestivalSensitive': is_festival_sensitive,
-            'baseForecast': forecast['baseForecast']
-        })
-    
-    return festival_forecasts
-
-def machine_learning_forecast(df: pd.DataFrame) -> List[Dict]:
+    is_festival_sensitive = df['is_festival_sensitive'].to_numpy(dtype=bool)
+    base_values = base_forecasts['baseForecast'].to_numpy()
+    
+    # Non-festival sensitive products get minimal boost
+    surge_factor = np.where(is_festival_sensitive, festival_multiplier, 1.1)
+    festival_demand = base_values * surge_factor
+    
+    return base_forecasts[['sku', 'warehouse']].assign(
+        festivalForecast=np.round(festival_demand, 0),
+        surgeFactor=np.round(surge_factor, 2),
+        isFestivalSensitive=is_festival_sensitive,
+        baseForecast=base_values
+    )
+
+def machine_learning_forecast(df: pd.DataFrame) -> pd.DataFrame:
     """Generate ML-based forecasts using Random Forest"""
-    ml_forecasts = []
-    
     try:
-        # Prepare features
-        features = []
-        targets = []
+        # Prepare features (categorical codes give a stable integer encoding of the labels)
+        X = np.column_stack([
+            df['current_stock'].to_numpy(dtype=np.float32),
+            df['forecast_demand'].to_numpy(dtype=np.float32),
+            df['is_festival_sensitive'].to_numpy(dtype=np.uint8),
+            df['warehouse'].astype('category').cat.codes.to_numpy(),
+            df['product_category'].astype('category').cat.codes.to_numpy()
+        ]).astype(np.float32)
+        y = df['actual_demand'].to_numpy(dtype=np.float32)
+        
+        if len(X) <= 2:  # Need minimum samples for ML
+            return ml_fallback_forecast(df, confidence=0.7)
         
-        for _, row in df.iterrows():
-            # Create feature vector
-            feature_vector = [
-                row['current_stock'],
-                row['forecast_demand'],
-                1 if row['is_festival_sensitive'] else 0,
-                hash(row['warehouse']) % 1000,  # Warehouse encoding
-                hash(row['product_category']) % 1000  # Category encoding
-            ]
-            features.append(feature_vector)
-            targets.append(row['actual_demand'])
+        # Simple Random Forest model, fit once per catalog and demand level
+        model_key = forecast_model_key(df)
+        rf_model = load_or_fit_forest(model_key, X, y)
         
-        if len(features) > 2:  # Need minimum samples for ML
-            X = np.array(features)
-            y = np.array(targets)
-            
-            # Simple Random Forest model
-            rf_model = RandomForestRegressor(n_estimators=10, random_state=42)
-            rf_model.fit(X, y)
-            
-            # Generate predictions
-            predictions = rf_model.predict(X)
-            
-            for i, (_, row) in enumerate(df.iterrows()):
-                ml_forecasts.append({
-                    'sku': row['sku'],
-                    'warehouse': row['warehouse'],
-                    'mlForecast': round(max(0, predictions[i]), 0),
-                    'confidence': round(min(0.95, max(0.6, 1 - abs(predictions[i] - targets[i]) / max(1, targets[i]))), 2)
-                })
+        # Generate predictions; X is already a C-contiguous float32 matrix, so skip
+        # per-tree input validation and the joblib dispatch of RandomForestRegressor.predict
+        if USE_ONNX and len(X) >= ONNX_MIN_ROWS:
+            predictions = onnx_predict(rf_model, X, model_key)
         else:
-            # Fallback for insufficient data
-            for _, row in df.iterrows():
-                ml_forecasts.append({
-                    'sku': row['sku'],
-                    'warehouse': row['warehouse'],
-                    'mlForecast': row['actual_demand'],
-                    'confidence': 0.7
-                })
+            predictions = np.mean([tree.predict(X, check_input=False) for tree in rf_model.estimators_], axis=0)
+        
+        return df[['sku', 'warehouse']].assign(
+            mlForecast=np.round(np.maximum(0, predictions), 0),
+            confidence=np.round(np.clip(1 - np.abs(predictions - y) / np.maximum(1, y), 0.6, 0.95), 2)
+        )
     
     except Exception as e:
         # Fallback on error
-        for _, row in df.iterrows():
-            ml_forecasts.append({
-                'sku': row['sku'],
-                'warehouse': row['warehouse'],
-                'mlForecast': row['actual_demand'],
-                'confidence': 0.5
-            })
-    
-    return ml_forecasts
+        return ml_fallback_forecast(df, confidence=0.5)
 
-def create_ensemble_forecast(base_forecasts: List[Dict], festival_forecasts: List[Dict], ml_forecasts: List[Dict]) -> List[Dict]:
-    """Create ensemble forecast combining multiple methods"""
-    ensemble_forecasts = []
-    
-    # Create lookup dictionaries
-    festival_dict = {f['sku']: f for f in festival_forecasts}
-    ml_dict = {f['sku']: f for f in ml_forecasts}
-    
-    for base in base_forecasts:
-        sku = base['sku']
-        
-        # Get corresponding forecasts
-        festival = festival_dict.get(sku, {})
-        ml = ml_dict.get(sku, {})
-        
-        # Weighted ensemble
-        base_weight = 0.3
-        festival_weight = 0.4
-        ml_weight = 0.3
-        
-        base_val = base.get('baseForecast', 0)
-        festival_val = festival.get('festivalForecast', base_val)
-        ml_val = ml.get('mlForecast', base_val)
-        
-        ensemble_value = (
-            base_val * base_weight +
-            festival_val * festival_weight +
-            ml_val * ml_weight
+def ml_fallback_forecast(df: pd.DataFrame, confidence: float) -> pd.DataFrame:
+    """Echo actual demand when the model can't be used"""
+    return df[['sku', 'warehouse']].assign(mlForecast=df['actual_demand'], confidence=confidence)
+
+def forecast_model_key(df: pd.DataFrame) -> str:
+    """
+    Key under which a fitted forest is reused: SKU catalog, feature schema, ISO week
+    and mean actual demand, so drift in demand level or a new week forces a refit.
+    The warehouse and category label sets are included because the features encode
+    them as category codes, which shift whenever the set of labels changes.
+    """
+    year, week, _ = datetime.now().isocalendar()
+    payload = orjson.dumps([
+        FORECAST_MODEL_VERSION,
+        sorted(df['sku'].tolist()),
+        sorted(df['warehouse'].unique().tolist()),
+        sorted(df['product_category'].unique().tolist()),
+        f"{year}-W{week}",
+        round(float(df['actual_demand'].mean()))
+    ])
+    return blake2b(payload, digest_size=16).hexdigest()
+
+def private_model_dir() -> Optional[str]:
+    """FORECAST_MODEL_DIR (created with mode 0700), or None if unset or writable by anyone else"""
+    if not FORECAST_MODEL_DIR:
+        return None
+    try:
+        os.makedirs(FORECAST_MODEL_DIR, mode=0o700, exist_ok=True)
+        dir_stat = os.stat(FORECAST_MODEL_DIR)
+    except OSError:
+        return None
+    if dir_stat.st_uid != os.getuid() or dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return None
+    return FORECAST_MODEL_DIR
+
+def load_or_fit_forest(model_key: str, X: np.ndarray, y: np.ndarray) -> RandomForestRegressor:
+    """Fitted forest for model_key from memory, then (if enabled) disk, otherwise fit and persist it"""
+    rf_model = _model_cache.get(model_key)
+    if rf_model is not None:
+        return rf_model
+    
+    model_dir = private_model_dir()
+    path = os.path.join(model_dir, f"{model_key}.joblib") if model_dir else None
+    if path is not None:
+        try:
+            rf_model = joblib.load(path)
+        except Exception:
+            pass  # Not persisted yet (or unreadable): refit below
+    
+    if rf_model is None:
+        # Extra training threads only pay off past joblib's startup cost
+        rf_model = RandomForestRegressor(
+            n_estimators=10,
+            random_state=42,
+            max_depth=8,
+            n_jobs=FOREST_JOBS if len(X) >= 50 else 1
         )
-        
-        ensemble_forecasts.append({
+        rf_model.fit(X, y)
+        if path is not None:
+            try:
+                # Write-then-rename so concurrent workers never read a partial file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                joblib.dump(rf_model, tmp_path, compress=3)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # Persistence is best effort
+    
+    _model_cache[model_key] = rf_model
+    return rf_model
+
+def onnx_predict(rf_model: RandomForestRegressor, X: np.ndarray, model_key: str) -> np.ndarray:
+    """Predict through ONNX Runtime, converting each fitted forest once"""
+    session = _onnx_sessions.get(model_key)
+    if session is None:
+        onnx_model = convert_sklearn(rf_model, initial_types=[('X', FloatTensorType([None, X.shape[1]]))])
+        session = ort.InferenceSession(onnx_model.SerializeToString(), providers=['CPUExecutionProvider'])
+        _onnx_sessions[model_key] = session
+    return session.run(None, {'X': X})[0].ravel().astype(float)
+
+def create_ensemble_forecast(base_forecasts: pd.DataFrame, festival_forecasts: pd.DataFrame, ml_forecasts: pd.DataFrame) -> pd.DataFrame:
+    """Create ensemble forecast combining multiple methods"""
+    base_weight = 0.3
+    festival_weight = 0.4
+    ml_weight = 0.3
+    
+    base_vals = base_forecasts['baseForecast'].to_numpy()
+    festival_vals = festival_forecasts['festivalForecast'].to_numpy()
+    ml_vals = ml_forecasts['mlForecast'].to_numpy()
+    
+    # Weighted ensemble
+    ensemble = evaluate('b * bw + f * fw + m * mw', {
+        'b': base_vals.astype(np.float64),
+        'f': festival_vals.astype(np.float64),
+        'm': ml_vals.astype(np.float64),
+        'bw': base_weight, 'fw': festival_weight, 'mw': ml_weight
+    })
+    
+    return base_forecasts[['sku', 'warehouse']].assign(
+        ensembleForecast=np.round(ensemble, 0),
+        baseWeight=base_weight,
+        festivalWeight=festival_weight,
+        mlWeight=ml_weight,
+        base=base_vals,
+        festival=festival_vals,
+        ml=ml_vals
+    )
+
+ENSEMBLE_COLUMNS = ['sku', 'warehouse', 'ensembleForecast', 'baseWeight', 'festivalWeight', 'mlWeight',
+                    'base', 'festival', 'ml']
+
+def ensemble_records(ensemble_forecasts: pd.DataFrame) -> List[Dict]:
+    """Ensemble rows as response records, with the component forecasts nested"""
+    # Plain tuples, unpacked positionally: no per-row Series or namedtuple class
+    return [
+        {
             'sku': sku,
-            'warehouse': base['warehouse'],
-            'ensembleForecast': round(ensemble_value, 0),
+            'warehouse': warehouse,
+            'ensembleForecast': forecast,
             'baseWeight': base_weight,
             'festivalWeight': festival_weight,
             'mlWeight': ml_weight,
-            'components': {
-                'base': base_val,
-                'festival': festival_val,
-                'ml': ml_val
-            }
-        })
-    
-    return ensemble_forecasts
+            'components': {'base': base, 'festival': festival, 'ml': ml}
+        }
+        for sku, warehouse, forecast, base_weight, festival_weight, ml_weight, base, festival, ml
+        in ensemble_forecasts[ENSEMBLE_COLUMNS].itertuples(index=False, name=None)
+    ]
 
-def calculate_forecast_confidence(df: pd.DataFrame, ensemble_forecasts: List[Dict]) -> List[Dict]:
+def calculate_forecast_confidence(df: pd.DataFrame, ensemble_forecasts: pd.DataFrame) -> pd.DataFrame:
     """Calculate confidence intervals for forecasts"""
-    confidence_intervals = []
+    # Historical accuracy per row of df, which ensemble_forecasts is aligned with
+    sku_mape = df['mape'].to_numpy(dtype=np.float64)
+    forecast_value = ensemble_forecasts['ensembleForecast'].to_numpy()
     
-    # Calculate historical forecast errors
-    df['forecast_error'] = abs(df['forecast_demand'] - df['actual_demand'])
-    df['mape'] = df['forecast_error'] / np.maximum(df['actual_demand'], 1) * 100
-    
-    overall_mape = df['mape'].mean()
-    
-    for forecast in ensemble_forecasts:
-        sku = forecast['sku']
-        forecast_value = forecast['ensembleForecast']
-        
-        # Calculate confidence based on historical accuracy
-        sku_row = df[df['sku'] == sku]
-        if not sku_row.empty:
-            sku_mape = sku_row['mape'].iloc[0]
-        else:
-            sku_mape = overall_mape
-        
-        # Confidence interval (assuming normal distribution)
-        error_margin = forecast_value * (sku_mape / 100) * 1.96  # 95% CI
-        
-        confidence_intervals.append({
-            'sku': sku,
-            'forecast': forecast_value,
-            'upperBound': round(forecast_value + error_margin, 0),
-            'lowerBound': round(max(0, forecast_value - error_margin), 0),
-            'confidenceLevel': round(max(0.5, 1 - sku_mape / 100), 2),
-            'mape': round(sku_mape, 2)
-        })
-    
-    return confidence_intervals
+    # Confidence interval (assuming normal distribution)
+    if len(forecast_value) > JIT_MIN_ROWS:
+        upper, lower = _confidence_bounds(forecast_value.astype(np.float64), sku_mape)
+    else:
+        error_margin = evaluate('fv * (mape / 100.0) * 1.96', {'fv': forecast_value, 'mape': sku_mape})  # 95% CI
+        upper = forecast_value + error_margin
+        lower = np.maximum(0, forecast_value - error_margin)
+    
+    return ensemble_forecasts[['sku']].assign(
+        forecast=forecast_value,
+        upperBound=np.round(upper, 0),
+        lowerBound=np.round(lower, 0),
+        confidenceLevel=np.round(np.maximum(0.5, 1 - sku_mape / 100), 2),
+        mape=np.round(sku_mape, 2)
+    )
+
+@njit(cache=True)
+def _confidence_bounds(forecast: np.ndarray, mape: np.ndarray):
+    """95% CI bounds in one pass: forecast +/- forecast * mape% * 1.96, floored at zero"""
+    upper = np.empty_like(forecast)
+    lower = np.empty_like(forecast)
+    for i in range(forecast.shape[0]):
+        error_margin = forecast[i] * (mape[i] / 100.0) * 1.96
+        upper[i] = forecast[i] + error_margin
+        lower[i] = max(0.0, forecast[i] - error_margin)
+    return upper, lower
 
 def calculate_forecast_accuracy(df: pd.DataFrame) -> Dict:
     """Calculate various forecast accuracy metrics"""
@@ -299,13 +454,11 @@ def calculate_forecast_accuracy(df: pd.DataFrame) -> Dict:
         return {"message": "No valid forecast data"}
     
     # Calculate accuracy metrics
-    df['abs_error'] = abs(df['forecast_demand'] - df['actual_demand'])
-    df['percent_error'] = df['abs_error'] / np.maximum(df['actual_demand'], 1) * 100
-    df['squared_error'] = (df['forecast_demand'] - df['actual_demand']) ** 2
+    forecast_error = df['forecast_error'].to_numpy()
     
-    mae = df['abs_error'].mean()
-    mape = df['percent_error'].mean()
-    rmse = np.sqrt(df['squared_error'].mean())
+    mae = forecast_error.mean()
+    mape = df['mape'].mean()
+    rmse = np.sqrt(np.mean(forecast_error ** 2))
     
     # Bias calculation
     bias = (df['forecast_demand'] - df['actual_demand']).mean()
@@ -324,50 +477,95 @@ def calculate_demand_volatility(df: pd.DataFrame) -> Dict:
     if df.empty:
         return {"message": "No data available"}
     
-    # Calculate coefficient of variation
-    df['demand_cv'] = abs(df['forecast_demand'] - df['actual_demand']) / np.maximum(df['forecast_demand'], 1)
+    demand_cv = df['demand_cv'].to_numpy(dtype=np.float64)
+    buckets, counts, mean_cv, max_cv, min_cv = volatility_summary(demand_cv)
+    skus = df['sku'].to_numpy()
     
     volatility_stats = {
-        'averageVolatility': round(df['demand_cv'].mean(), 3),
-        'maxVolatility': round(df['demand_cv'].max(), 3),
-        'minVolatility': round(df['demand_cv'].min(), 3),
-        'volatileProducts': df[df['demand_cv'] > 0.3]['sku'].tolist(),
-        'stableProducts': df[df['demand_cv'] < 0.1]['sku'].tolist(),
+        'averageVolatility': round(mean_cv, 3),
+        'maxVolatility': round(max_cv, 3),
+        'minVolatility': round(min_cv, 3),
+        'volatileProducts': skus[buckets == VOLATILE_BUCKET].tolist(),
+        'stableProducts': skus[buckets == STABLE_BUCKET].tolist(),
         'volatilityDistribution': {
-            'low': len(df[df['demand_cv'] < 0.1]),
-            'medium': len(df[(df['demand_cv'] >= 0.1) & (df['demand_cv'] < 0.3)]),
-            'high': len(df[df['demand_cv'] >= 0.3])
+            'low': int(counts[STABLE_BUCKET]),
+            'medium': int(counts[1]),
+            'high': int(counts[2] + counts[VOLATILE_BUCKET])
         }
     }
     
     return volatility_stats
 
-def generate_forecast_recommendations(df: pd.DataFrame, ensemble_forecasts: List[Dict]) -> List[str]:
+# CV bucket edges: stable (<0.1), medium, exactly 0.3 (high but not "volatile"), volatile (>0.3)
+VOLATILITY_EDGES = np.array([0.1, 0.3, np.nextafter(0.3, np.inf)])
+STABLE_BUCKET = 0
+VOLATILE_BUCKET = 3
+
+def volatility_summary(demand_cv: np.ndarray):
+    """Bucket index per SKU, bucket counts, and mean/max/min of the demand CV"""
+    if len(demand_cv) > JIT_MIN_ROWS:
+        buckets = np.empty(len(demand_cv), dtype=np.intp)
+        counts = np.zeros(len(VOLATILITY_EDGES) + 1, dtype=np.intp)
+        mean_cv, max_cv, min_cv = _volatility_summary(demand_cv, VOLATILITY_EDGES, buckets, counts)
+        return buckets, counts, mean_cv, max_cv, min_cv
+    
+    buckets = np.digitize(demand_cv, VOLATILITY_EDGES)
+    counts = np.bincount(buckets, minlength=len(VOLATILITY_EDGES) + 1)
+    return buckets, counts, demand_cv.mean(), demand_cv.max(), demand_cv.min()
+
+@njit(cache=True)
+def _volatility_summary(demand_cv, edges, buckets, counts):
+    """Single pass over demand CV: fills bucket index and counts, returns mean, max, min"""
+    total = 0.0
+    max_cv = -np.inf
+    min_cv = np.inf
+    for i in range(demand_cv.shape[0]):
+        value = demand_cv[i]
+        total += value
+        max_cv = max(max_cv, value)
+        min_cv = min(min_cv, value)
+        bucket = 0
+        while bucket < edges.shape[0] and value >= edges[bucket]:
+            bucket += 1
+        buckets[i] = bucket
+        counts[bucket] += 1
+    return total / demand_cv.shape[0], max_cv, min_cv
+
+def forecast_recommendation_stats(df: pd.DataFrame, volatile_count: Optional[int] = None) -> Dict[str, int]:
+    """Counts the recommendation thresholds are checked against, from the precomputed error columns"""
+    actual_demand = df['actual_demand'].to_numpy()
+    if volatile_count is None:
+        volatile_count = int(np.count_nonzero(df['demand_cv'].to_numpy() > 0.3))
+    return {
+        'high_error_count': int(np.count_nonzero(df['forecast_error'].to_numpy() > actual_demand * 0.3)),
+        'volatile_count': volatile_count,
+        'festival_sensitive_count': int(np.count_nonzero(df['is_festival_sensitive'].to_numpy(dtype=bool))),
+        'zero_demand_count': int(np.count_nonzero(actual_demand == 0)),
+        'sku_count': len(df)
+    }
+
+def generate_forecast_recommendations(df: pd.DataFrame, ensemble_forecasts: pd.DataFrame,
+                                      precomputed: Optional[Dict[str, int]] = None) -> List[str]:
     """Generate actionable forecasting recommendations"""
+    rec_stats = precomputed if precomputed is not None else forecast_recommendation_stats(df)
     recommendations = []
     
     # Accuracy recommendations
-    df['forecast_error'] = abs(df['forecast_demand'] - df['actual_demand'])
-    high_error_count = len(df[df['forecast_error'] > df['actual_demand'] * 0.3])
-    
-    if high_error_count > len(df) * 0.3:
+    if rec_stats['high_error_count'] > rec_stats['sku_count'] * 0.3:
         recommendations.append("Implement advanced forecasting algorithms - high forecast errors detected")
     
     # Volatility recommendations
-    df['demand_cv'] = abs(df['forecast_demand'] - df['actual_demand']) / np.maximum(df['forecast_demand'], 1)
-    volatile_count = len(df[df['demand_cv'] > 0.3])
-    
+    volatile_count = rec_stats['volatile_count']
     if volatile_count > 0:
         recommendations.append(f"Implement demand sensing for {volatile_count} high-volatility products")
     
     # Festival recommendations
-    festival_sensitive_count = len(df[df['is_festival_sensitive'] == True])
+    festival_sensitive_count = rec_stats['festival_sensitive_count']
     if festival_sensitive_count > 0:
         recommendations.append(f"Activate festival planning for {festival_sensitive_count} sensitive products")
     
     # Data quality recommendations
-    zero_demand_count = len(df[df['actual_demand'] == 0])
-    if zero_demand_count > 0:
+    if rec_stats['zero_demand_count'] > 0:
         recommendations.append("Review data quality - zero demand values detected")
     
     # General recommendations
@@ -384,17 +582,20 @@ def plan_festival_demand(sku_data: List[Any], festival_multiplier: float, produc
     """
     Comprehensive festival demand planning
     """
-    # Generate festival-specific forecasts
-    festival_forecasts = generate_demand_forecast(sku_data, festival_multiplier)
+    # Normalize SKUs once for the forecast and the planning steps below
+    df = build_sku_frame(sku_data)
+    
+    # Generate festival-specific forecasts (only the parts the plan reports)
+    festival_forecasts = forecast_from_frame(df, festival_multiplier, FESTIVAL_FORECAST_COMPONENTS)
     
     # Calculate production requirements
-    production_requirements = calculate_festival_production_needs(sku_data, festival_multiplier, production_constraints)
+    production_requirements = calculate_festival_production_needs(df, festival_multiplier, production_constraints)
     
     # Inventory buildup strategy
-    inventory_strategy = plan_inventory_buildup(sku_data, festival_multiplier)
+    inventory_strategy = plan_inventory_buildup(df, festival_multiplier)
     
     # Material requirements
-    material_requirements = calculate_material_requirements(sku_data, festival_multiplier)
+    material_requirements = calculate_material_requirements(df, festival_multiplier)
     
     # Timeline planning
     execution_timeline = create_festival_timeline(sku_data, festival_multiplier)
@@ -408,34 +609,38 @@ def plan_festival_demand(sku_data: List[Any], festival_multiplier: float, produc
         "execution_timeline": execution_timeline
     }
 
-def calculate_festival_production_needs(sku_data: List[Any], festival_multiplier: float, production_constraints: List[Any]) -> Dict:
+def calculate_festival_demand(df: pd.DataFrame, festival_multiplier: float) -> np.ndarray:
+    """Festival-period demand per SKU: sensitive SKUs surge by the multiplier, others by 10%"""
+    is_festival_sensitive = df['is_festival_sensitive'].to_numpy(dtype=bool)
+    return df['actual_demand'].to_numpy() * np.where(is_festival_sensitive, festival_multiplier, 1.1)
+
+def calculate_festival_production_needs(df: pd.DataFrame, festival_multiplier: float, production_constraints: List[Any]) -> Dict:
     """Calculate production needs for festival demand"""
     total_capacity = sum(
         (c.weekly_capacity if hasattr(c, 'weekly_capacity') else 100) 
         for c in production_constraints
     ) if production_constraints else 200
     
-    production_needs = []
-    total_festival_demand = 0
+    base_demand = df['actual_demand'].to_numpy()
+    festival_demand = calculate_festival_demand(df, festival_multiplier)
+    total_festival_demand = sum(festival_demand.tolist())  # Sequential sum, as the per-SKU loop did
     
-    for sku in sku_data:
-        base_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        is_festival_sensitive = getattr(sku, 'is_festival_sensitive', False)
-        
-        if is_festival_sensitive:
-            festival_demand = base_demand * festival_multiplier
-        else:
-            festival_demand = base_demand * 1.1
-        
-        total_festival_demand += festival_demand
-        
-        production_needs.append({
-            'sku': sku.sku if hasattr(sku, 'sku') else sku.get('sku', ''),
-            'baseDemand': base_demand,
-            'festivalDemand': round(festival_demand, 0),
-            'additionalProduction': round(festival_demand - base_demand, 0),
-            'isFestivalSensitive': is_festival_sensitive
-        })
+    production_needs = [
+        {
+            'sku': sku,
+            'baseDemand': base,
+            'festivalDemand': festival,
+            'additionalProduction': additional,
+            'isFestivalSensitive': sensitive
+        }
+        for sku, base, festival, additional, sensitive in zip(
+            df['sku'].tolist(),
+            base_demand.tolist(),
+            np.round(festival_demand, 0).tolist(),
+            np.round(festival_demand - base_demand, 0).tolist(),
+            df['is_festival_sensitive'].tolist()
+        )
+    ]
     
     capacity_utilization = (total_festival_demand / total_capacity) * 100 if total_capacity > 0 else 0
     
@@ -448,34 +653,38 @@ def calculate_festival_production_needs(sku_data: List[Any], festival_multiplier
         'recommendedActions': generate_capacity_actions(capacity_utilization, total_festival_demand, total_capacity)
     }
 
-def plan_inventory_buildup(sku_data: List[Any], festival_multiplier: float) -> Dict:
+def plan_inventory_buildup(df: pd.DataFrame, festival_multiplier: float) -> Dict:
     """Plan inventory buildup strategy for festival"""
-    buildup_plan = []
+    is_festival_sensitive = df['is_festival_sensitive'].to_numpy(dtype=bool)
+    festival_demand = calculate_festival_demand(df, festival_multiplier)
     
-    for sku in sku_data:
-        current_stock = sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0)
-        base_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        is_festival_sensitive = getattr(sku, 'is_festival_sensitive', False)
-        
-        if is_festival_sensitive:
-            festival_demand = base_demand * festival_multiplier
-            safety_buffer = festival_demand * 0.2  # 20% safety buffer
-        else:
-            festival_demand = base_demand * 1.1
-            safety_buffer = festival_demand * 0.1  # 10% safety buffer
-        
-        required_inventory = festival_demand + safety_buffer
-        inventory_gap = max(0, required_inventory - current_stock)
-        
-        buildup_plan.append({
-            'sku': sku.sku if hasattr(sku, 'sku') else sku.get('sku', ''),
-            'currentStock': current_stock,
-            'festivalDemand': round(festival_demand, 0),
-            'requiredInventory': round(required_inventory, 0),
-            'inventoryGap': round(inventory_gap, 0),
-            'buildupWeeks': 4 if is_festival_sensitive else 2,
-            'weeklyBuildupTarget': round(inventory_gap / (4 if is_festival_sensitive else 2), 0) if inventory_gap > 0 else 0
-        })
+    # 20% safety buffer for festival-sensitive SKUs, 10% otherwise
+    safety_buffer = festival_demand * np.where(is_festival_sensitive, 0.2, 0.1)
+    required_inventory = festival_demand + safety_buffer
+    inventory_gap = np.maximum(0, required_inventory - df['current_stock'].to_numpy())
+    buildup_weeks = np.where(is_festival_sensitive, 4, 2)
+    weekly_target = np.where(inventory_gap > 0, np.round(inventory_gap / buildup_weeks, 0), 0)
+    
+    buildup_plan = [
+        {
+            'sku': sku,
+            'currentStock': stock,
+            'festivalDemand': festival,
+            'requiredInventory': required,
+            'inventoryGap': gap,
+            'buildupWeeks': weeks,
+            'weeklyBuildupTarget': target
+        }
+        for sku, stock, festival, required, gap, weeks, target in zip(
+            df['sku'].tolist(),
+            df['current_stock'].tolist(),
+            np.round(festival_demand, 0).tolist(),
+            np.round(required_inventory, 0).tolist(),
+            np.round(inventory_gap, 0).tolist(),
+            buildup_weeks.tolist(),
+            weekly_target.tolist()
+        )
+    ]
     
     return {
         'buildupPlan': buildup_plan,
@@ -484,34 +693,29 @@ def plan_inventory_buildup(sku_data: List[Any], festival_multiplier: float) -> D
         'timelineRecommendation': "Start inventory buildup 4-6 weeks before festival"
     }
 
-def calculate_material_requirements(sku_data: List[Any], festival_multiplier: float) -> Dict:
+def calculate_material_requirements(df: pd.DataFrame, festival_multiplier: float) -> Dict:
     """Calculate raw material requirements for festival production"""
-    # Simplified material requirements (would be more complex in reality)
-    material_map = {
-        'Snacks': {'flour': 0.6, 'oil': 0.2, 'seasoning': 0.1},
-        'Beverages': {'water': 0.8, 'concentrate': 0.15, 'packaging': 0.05},
-        'Unknown': {'raw_material': 0.5, 'packaging': 0.3}
+    categories = df['product_category'].tolist()
+    category_idx = np.fromiter(
+        (_MATERIAL_CATEGORY_INDEX.get(category, UNKNOWN_MATERIAL_CATEGORY) for category in categories),
+        dtype=np.intp, count=len(categories)
+    )
+    
+    # Each SKU's festival demand spread over its category's ratios; bincount adds them in SKU
+    # order, so totals match a running per-SKU sum bit for bit
+    sku_materials = calculate_festival_demand(df, festival_multiplier)[:, None] * MATERIAL_RATIOS[category_idx]
+    material_idx = np.broadcast_to(np.arange(len(MATERIALS)), sku_materials.shape)
+    totals = np.bincount(material_idx.ravel(), weights=sku_materials.ravel(), minlength=len(MATERIALS))
+    material_totals = dict(zip(MATERIALS, totals.tolist()))
+    
+    # Materials of the categories present, in order of first appearance
+    _, first_seen = np.unique(category_idx, return_index=True)
+    material_requirements = {
+        material: material_totals[material]
+        for category in category_idx[np.sort(first_seen)].tolist()
+        for material in MATERIAL_MAP[MATERIAL_CATEGORIES[category]]
     }
     
-    material_requirements = {}
-    
-    for sku in sku_data:
-        base_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        category = getattr(sku, 'product_category', 'Unknown')
-        is_festival_sensitive = getattr(sku, 'is_festival_sensitive', False)
-        
-        festival_demand = base_demand * (festival_multiplier if is_festival_sensitive else 1.1)
-        
-        if category in material_map:
-            materials = material_map[category]
-        else:
-            materials = material_map['Unknown']
-        
-        for material, ratio in materials.items():
-            if material not in material_requirements:
-                material_requirements[material] = 0
-            material_requirements[material] += festival_demand * ratio
-    
     return {
         'materialRequirements': {k: round(v, 0) for k, v in material_requirements.items()},
         'procurementLead': "2-3 weeks for critical materials",
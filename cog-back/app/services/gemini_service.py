@@ -1,36 +1,106 @@
-import google.generativeai as genai
+import httpx
+import orjson
 import os
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from typing import Dict, Any
+from hashlib import blake2b
+from typing import ClassVar, Dict, Any, Optional
 
 load_dotenv()
 
+GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+SYSTEM_PROMPT = """You are a supply chain optimization expert assistant. 
+            You help analyze inventory data, production planning, demand forecasting, and procurement decisions.
+            Provide practical, actionable insights based on the data provided."""
+
+def response_cache_key(query: str, context: Optional[Dict[str, Any]]) -> str:
+    """Digest of a query and its (order-insensitive) context"""
+    payload = query.encode() + b'||' + orjson.dumps(context, option=orjson.OPT_SORT_KEYS, default=str)
+    return blake2b(payload, digest_size=16).hexdigest()
+
+def create_http_client() -> httpx.AsyncClient:
+    """Keep-alive HTTP/2 client shared by all Gemini calls"""
+    return httpx.AsyncClient(
+        base_url=GEMINI_API_BASE,
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    )
+
 class GeminiService:
+    # Dashboards re-ask the same questions about the same context; shared by all instances
+    _response_cache: ClassVar[TTLCache] = TTLCache(maxsize=256, ttl=300)
+
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+        self.api_key = api_key
+        self.model_name = 'gemini-2.5-flash'
+        self.client: Optional[httpx.AsyncClient] = None
     
+    async def start(self) -> None:
+        """Open the pooled client and warm a connection to the Gemini endpoint"""
+        if self.client is None:
+            self.client = create_http_client()
+        try:
+            await self.client.head("/models", timeout=5.0)
+        except httpx.HTTPError:
+            pass  # Warm-up is best effort; the first real call will connect
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _generate(self, prompt: str) -> str:
+        """Single generateContent call over the pooled client"""
+        if self.client is None:
+            self.client = create_http_client()
+
+        response = await self.client.post(
+            f"/models/{self.model_name}:generateContent",
+            headers={"x-goog-api-key": self.api_key},
+            json={"contents": [{"parts": [{"text": prompt}]}]}
+        )
+        response.raise_for_status()
+        return response.json()["candidates"][0]["content"]["parts"][0]["text"]
+
     async def generate_response(self, query: str, context: Dict[str, Any] = None) -> str:
+        key = response_cache_key(query, context)
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             # Create context-aware prompt for supply chain optimization
-            system_prompt = """You are a supply chain optimization expert assistant. 
-            You help analyze inventory data, production planning, demand forecasting, and procurement decisions.
-            Provide practical, actionable insights based on the data provided."""
-            
             if context:
                 context_str = f"Current system context: {context}"
-                full_prompt = f"{system_prompt}\n\nContext: {context_str}\n\nUser Query: {query}"
+                full_prompt = f"{SYSTEM_PROMPT}\n\nContext: {context_str}\n\nUser Query: {query}"
             else:
-                full_prompt = f"{system_prompt}\n\nUser Query: {query}"
+                full_prompt = f"{SYSTEM_PROMPT}\n\nUser Query: {query}"
             
-            response = self.model.generate_content(full_prompt)
-            return response.text
+            response = await self._generate(full_prompt)
         
         except Exception as e:
             return f"Sorry, I encountered an error: {str(e)}"
 
-gemini_service = GeminiService()
+        # Only successful answers are cached
+        self._response_cache[key] = response
+        return response
+
+_gemini_service: Optional[GeminiService] = None
+
+def get_gemini_service() -> GeminiService:
+    """Shared GeminiService, created on first use so importing the app doesn't require GEMINI_API_KEY"""
+    global _gemini_service
+    if _gemini_service is None:
+        _gemini_service = GeminiService()
+    return _gemini_service
+
+async def close_gemini_service() -> None:
+    """Close the shared service's HTTP client if it was ever created"""
+    if _gemini_service is not None:
+        await _gemini_service.close()
@@ -1,7 +1,36 @@
+import heapq
+import math
+import os
+import sys
 import numpy as np
+import orjson
 import pulp
-from typing import List, Dict, Any
+from cachetools import LRUCache
+from functools import lru_cache
+from hashlib import blake2b
+from itertools import chain
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.services.jit import njit, NUMBA_AVAILABLE
+
+# Below this many orders the heap loop beats calling into (and compiling) the JIT kernel
+JIT_MIN_ORDERS = 1000
+
+# MIP starts from the previous solve of the same catalog/scenario are opt-in (OPTIMIZER_WARM_START=1):
+# they pay off on small perturbations of a scenario, and can cost time otherwise
+USE_WARM_START = os.getenv("OPTIMIZER_WARM_START", "0") == "1"
+_warm_starts = LRUCache(maxsize=32)
+
+# CBC never runs past the time limit (seconds). Solves already run one per analysis process, so CBC
+# is single-threaded unless CBC_THREADS says otherwise. Stopping early at a relative MIP gap
+# (e.g. CBC_GAP_REL=0.01) is opt-in, and plans solved that way are reported as Feasible
+CBC_THREADS = max(1, int(os.getenv("CBC_THREADS", "1")))
+CBC_TIME_LIMIT = 30
+CBC_GAP_REL = max(0.0, float(os.getenv("CBC_GAP_REL", "0")))
+
+# Slack allowed when rounding a relaxed solution and re-checking it against the constraints
+ROUNDING_TOLERANCE = 1e-6
 
 # ----------- LOAD BALANCER OPTIMIZER (UNCHANGED) ----------- #
 def optimize_orders(orders, stations: int):
@@ -10,210 +39,451 @@ def optimize_orders(orders, stations: int):
     Assign orders to stations by sorting jobs descending and
     always giving next largest job to least loaded station.
     """
-    # Sort orders by packingTime (largest first)
-    sorted_orders = sorted(orders, key=lambda x: x["packingTime"], reverse=True)
-    station_loads = [0] * stations
+    # Sort orders by packingTime (largest first); a stable argsort on the negated times keeps
+    # equal times in input order, like sorted(..., reverse=True), without a Python key callback.
+    # Integer packing times stay integer, so loads serialize exactly as before
+    times = np.array([order["packingTime"] for order in orders])
+    order_ix = np.argsort(-times, kind='stable')
+    sorted_orders = [orders[i] for i in order_ix.tolist()]
+    
+    if NUMBA_AVAILABLE and len(sorted_orders) > JIT_MIN_ORDERS:
+        order_stations, station_totals = _lpt_assign(times[order_ix], stations)
+        assignments = [
+            {"orderId": order["id"], "station": station + 1}
+            for order, station in zip(sorted_orders, order_stations.tolist())
+        ]
+        station_loads = station_totals.tolist()
+    else:
+        assignments, station_loads = _lpt_assign_heap(sorted_orders, stations)
+
+    station_summary = [
+        {"station": i + 1, "totalTime": load}
+        for i, load in enumerate(station_loads)
+    ]
+
+    # One array for the max/min/mean reductions
+    loads = np.asarray(station_loads)
+    mean_load = loads.mean()
+    # No work at all (e.g. no orders) is perfectly balanced
+    imbalance = round(float((loads.max() - loads.min()) / mean_load * 100), 2) if mean_load else 0.0
+
+    return {
+        "assignments": assignments,
+        "stationLoadSummary": station_summary,
+        "imbalancePercent": imbalance,
+        "insight": f"LPT scheduling reduced load imbalance to {imbalance}%."
+    }
+
+def _lpt_assign_heap(sorted_orders: List[Dict], stations: int) -> Tuple[List[Dict], List]:
+    """LPT assignment over a min-heap of (load, station)"""
+    # Ties go to the lowest station index, as with argmin
+    heap = [(0, i) for i in range(stations)]
     assignments = []
 
     for order in sorted_orders:
-        # Find the station with minimum load
-        min_station = int(np.argmin(station_loads))
-        station_loads[min_station] += order["packingTime"]
+        # Take the station with minimum load
+        load, min_station = heapq.heappop(heap)
+        heapq.heappush(heap, (load + order["packingTime"], min_station))
         assignments.append({
             "orderId": order["id"],
             "station": min_station + 1
         })
 
-    station_summary = [
-        {"station": i+1, "totalTime": station_loads[i]}
-        for i in range(stations)
+    station_loads = [0] * stations
+    for load, station in heap:
+        station_loads[station] = load
+    return assignments, station_loads
+
+@njit(cache=True)
+def _lpt_assign(times: np.ndarray, stations: int):
+    """LPT assignment of already-sorted times: (station per order, final station loads)"""
+    order_stations = np.empty(times.shape[0], dtype=np.int32)
+    loads = np.zeros(stations, dtype=times.dtype)
+    for i in range(times.shape[0]):
+        min_idx = 0
+        for k in range(1, stations):
+            if loads[k] < loads[min_idx]:
+                min_idx = k
+        loads[min_idx] += times[i]
+        order_stations[i] = min_idx
+    return order_stations, loads
+
+# ----------- ENHANCED INVENTORY OPTIMIZER ----------- #
+def add_linear_constraint(model: pulp.LpProblem, terms: List[Tuple[pulp.LpVariable, float]], sense: int, rhs: float) -> None:
+    """Add sum(coef * var) <sense> rhs to model straight from its (var, coef) terms"""
+    model.addConstraint(pulp.LpConstraint(pulp.LpAffineExpression(terms), sense, rhs=rhs))
+
+def _intern(value: Any) -> Any:
+    """Intern string ids so repeated keys share one object (and dict lookups short-circuit on identity)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _normalize_skus(sku_data: List[Any], scenario: Any = None) -> SimpleNamespace:
+    """
+    Read every SKU field optimize_inventory needs once, as arrays aligned with sku_data.
+    Accepts request structs/models or legacy camelCase dicts (with the legacy defaults).
+    Given a scenario, also precomputes the surge-adjusted demand and its 90% service level.
+    """
+    rows = [
+        (sku.sku, sku.warehouse, sku.unit_cost, sku.holding_cost_rate, sku.actual_demand, sku.stockout_penalty,
+         sku.current_stock) if hasattr(sku, 'sku') else
+        (sku['sku'], sku.get('warehouse', 'Delhi'), 10.0, 0.25, sku.get('actualDemand', 0), 50.0, sku.get('stock', 0))
+        for sku in sku_data
+    ]
+    sku_ids, warehouses, unit_cost, holding_rate, actual_demand, stockout_penalty, current_stock = (
+        zip(*rows) if rows else ((),) * 7
+    )
+    skus = SimpleNamespace(
+        sku_ids=np.array([_intern(sku_id) for sku_id in sku_ids], dtype=object),
+        warehouse=np.array(warehouses, dtype=object),
+        unit_cost=np.array(unit_cost, dtype=np.float64),
+        holding_rate=np.array(holding_rate, dtype=np.float64),
+        actual_demand=np.array(actual_demand),
+        stockout_penalty=np.array(stockout_penalty, dtype=np.float64),
+        current_stock=np.array(current_stock)
+    )
+    if scenario is not None:
+        skus.adjusted_demand = skus.actual_demand * scenario.demand_surge_factor
+        skus.min_production = skus.adjusted_demand * 0.9
+    return skus
+
+def _normalize_constraints(production_constraints: List[Any]) -> SimpleNamespace:
+    """
+    Factory arrays aligned with production_constraints. A missing production cost is NaN,
+    meaning "use the SKU's unit cost".
+    """
+    rows = [
+        (c.factory_location, c.weekly_capacity, c.production_cost_per_unit) if hasattr(c, 'factory_location') else
+        ('Delhi', 100, np.nan)
+        for c in production_constraints
     ]
+    factories, weekly_capacity, production_cost = zip(*rows) if rows else ((),) * 3
+    return SimpleNamespace(
+        factory=np.array([_intern(factory) for factory in factories], dtype=object),
+        weekly_capacity=np.array(weekly_capacity),
+        production_cost_per_unit=np.array(production_cost, dtype=np.float64)
+    )
 
-    imbalance = round(
-        (max(station_loads) - min(station_loads)) / (sum(station_loads)/stations) * 100,
-        2
+@lru_cache(maxsize=2)
+def cbc_solver(warm_start: bool = False) -> pulp.PULP_CBC_CMD:
+    """Shared CBC configuration (one instance with and one without MIP starts)"""
+    return pulp.PULP_CBC_CMD(
+        msg=0, warmStart=warm_start, threads=CBC_THREADS, timeLimit=CBC_TIME_LIMIT, gapRel=CBC_GAP_REL or None
     )
 
+def warm_start_key(sku_ids: List[str], factory_names: List[str], scenario: Any) -> str:
+    """Models with the same SKUs, factories and (rounded) scenario share a MIP start"""
+    payload = orjson.dumps([
+        sku_ids,
+        factory_names,
+        round(scenario.demand_surge_factor, 2),
+        round(scenario.capacity_utilization_target, 2)
+    ])
+    return blake2b(payload, digest_size=16).hexdigest()
+
+def apply_warm_start(model: pulp.LpProblem, solution: Optional[Dict[str, float]]) -> bool:
+    """Set a previous solution as the initial values of model's variables; False if there is none"""
+    if not solution:
+        return False
+    for var in model.variables():
+        value = solution.get(var.name)
+        if value is not None:
+            var.setInitialValue(value)
+    return True
+
+def round_relaxed_solution(model: pulp.LpProblem, sku_rows: List[Tuple], capacities: List[float]) -> bool:
+    """
+    Round an LP-relaxation solution in place. Each SKU's total production is rounded up to
+    whole units and spread over its factories as floor values plus single units, given to
+    the largest fractional parts among factories with spare capacity; inventory and shortage
+    are recomputed from it. Returns whether the rounded plan is integral and satisfies
+    every constraint of model.
+    """
+    spare = list(capacities)
+    floors = []
+    for sku_production, *_ in sku_rows:
+        values = [var.varValue or 0 for var in sku_production]
+        sku_floors = [math.floor(value + ROUNDING_TOLERANCE) for value in values]
+        for j, units in enumerate(sku_floors):
+            spare[j] -= units
+        floors.append((values, sku_floors))
+    
+    for (sku_production, inv_var, shortage_var, stock, adjusted_demand, demand), (values, sku_floors) in zip(sku_rows, floors):
+        missing = math.ceil(sum(values) - ROUNDING_TOLERANCE) - sum(sku_floors)
+        by_fraction = sorted(range(len(values)), key=lambda j: sku_floors[j] - values[j])
+        for j in by_fraction:
+            if missing <= 0:
+                break
+            if spare[j] >= 1:
+                sku_floors[j] += 1
+                spare[j] -= 1
+                missing -= 1
+        if missing > 0:
+            return False
+        
+        for var, units in zip(sku_production, sku_floors):
+            var.varValue = units
+        
+        inventory = stock + sum(sku_floors) - adjusted_demand
+        if abs(inventory - round(inventory)) > ROUNDING_TOLERANCE:
+            return False
+        inv_var.varValue = round(inventory)
+        shortage_var.varValue = max(0, demand - inv_var.varValue)
+    
+    return all(constraint.valid(ROUNDING_TOLERANCE) for constraint in model.constraints.values())
+
+def production_keys(sku_ids: List[Any], factory_names: List[Any]) -> List[List[str]]:
+    """"{sku}_{factory}" key of every production variable, formatted once per model"""
+    return [[f"{sku_id}_{factory}" for factory in factory_names] for sku_id in sku_ids]
+
+def _closed_form_single_factory(skus: SimpleNamespace, factories: SimpleNamespace, scenario: Any) -> Optional[Tuple]:
+    """
+    Exact solution of the inventory model for a single factory, where it separates per SKU.
+    Each SKU gets the least production meeting the 90% service level with non-negative
+    inventory; where the stockout penalty beats production plus holding cost, inventory is
+    then topped up to actual demand, best margin first, while capacity lasts.
+    Returns (allocations, inventory, total_cost), or None when the model is infeasible.
+    """
+    adjusted_demand = skus.adjusted_demand
+    # Inventory is integral, so the adjusted demand has to be too
+    if np.any(np.abs(adjusted_demand - np.round(adjusted_demand)) > ROUNDING_TOLERANCE):
+        return None
+    adjusted_demand = np.round(adjusted_demand)
+    
+    min_production = np.maximum(np.ceil(adjusted_demand * 0.9 - ROUNDING_TOLERANCE), adjusted_demand - skus.current_stock)
+    min_production = np.maximum(min_production, 0)
+    spare = math.floor(factories.weekly_capacity[0] * scenario.capacity_utilization_target + ROUNDING_TOLERANCE) - min_production.sum()
+    if spare < 0:
+        return None
+    
+    production_cost = factories.production_cost_per_unit[0]
+    unit_cost = skus.unit_cost if np.isnan(production_cost) else np.full(len(skus.unit_cost), production_cost)
+    holding_cost = skus.unit_cost * skus.holding_rate
+    margin = skus.stockout_penalty - unit_cost - holding_cost
+    
+    # Extra units that would each avoid a stockout, granted in order of margin
+    top_up = np.where(margin > 0, np.maximum(skus.actual_demand - (skus.current_stock + min_production - adjusted_demand), 0), 0)
+    order = np.argsort(-margin, kind='stable')
+    granted_before = np.cumsum(top_up[order]) - top_up[order]
+    extra = np.empty_like(top_up)
+    extra[order] = np.clip(spare - granted_before, 0, top_up[order])
+    
+    production = min_production + extra
+    inventory = skus.current_stock + production - adjusted_demand
+    shortage = np.maximum(skus.actual_demand - inventory, 0)
+    total_cost = float((unit_cost * production).sum() + (holding_cost * inventory).sum() + (skus.stockout_penalty * shortage).sum())
+    return production.astype(np.int64)[:, None].tolist(), inventory.astype(np.int64).tolist(), total_cost
+
+def variable_values(variables: np.ndarray) -> np.ndarray:
+    """Solved values of an object array of variables as ints, truncated like int(var.varValue or 0)"""
+    values = np.fromiter((var.varValue or 0 for var in variables.flat), dtype=np.float64, count=variables.size)
+    return values.reshape(variables.shape).astype(np.int64)
+
+def optimization_failed(status: str) -> Dict:
     return {
-        "assignments": assignments,
-        "stationLoadSummary": station_summary,
-        "imbalancePercent": imbalance,
-        "insight": f"LPT scheduling reduced load imbalance to {imbalance}%."
+        "status": status,
+        "message": "Optimization failed",
+        "productionPlan": [],
+        "inventoryPlan": [],
+        "totalCost": 0
     }
 
-# ----------- ENHANCED INVENTORY OPTIMIZER ----------- #
-def optimize_inventory(sku_data: List[Any], production_constraints: List[Any], scenario: Any) -> Dict:
+def inventory_result(sku_ids: List[Any], factory_names: List[Any], allocations: List[List[int]], inventory: List[int],
+                     current_stock: List[Any], total_cost_value: float, scenario: Any,
+                     include_analytics: bool = True) -> Dict:
+    """Response for a solved plan: per-SKU factory allocations and inventory, cost and (optionally) analytics"""
+    production_plan = []
+    inventory_plan = []
+    
+    for sku_id, sku_allocations, optimal_inventory, stock in zip(sku_ids, allocations, inventory, current_stock):
+        # Production plan
+        factory_allocations = dict(zip(factory_names, sku_allocations))
+        production_plan.append({
+            "sku": sku_id,
+            "factoryAllocations": factory_allocations,
+            "totalProduction": sum(factory_allocations.values())
+        })
+        
+        # Inventory plan
+        inventory_plan.append({
+            "sku": sku_id,
+            "optimalInventory": optimal_inventory,
+            "currentStock": stock,
+            "recommendation": "Increase" if optimal_inventory > stock else "Decrease"
+        })
+    
+    result = {
+        "status": "Optimal",
+        "productionPlan": production_plan,
+        "inventoryPlan": inventory_plan,
+        "totalCost": round(total_cost_value, 2)
+    }
+    
+    if include_analytics:
+        # Generate strategic recommendations
+        result["recommendations"] = generate_optimization_recommendations(production_plan, inventory_plan, scenario)
+        result["scenarioAnalysis"] = analyze_scenario_impact(scenario)
+        result["kpis"] = calculate_optimization_kpis(production_plan, inventory_plan)
+    
+    return result
+
+def optimize_inventory(sku_data: List[Any], production_constraints: List[Any], scenario: Any,
+                       use_lp_relaxation: bool = True, include_analytics: bool = True) -> Dict:
     """
-    Multi-objective inventory optimization with production constraints
+    Multi-objective inventory optimization with production constraints.
+    With use_lp_relaxation the LP relaxation is solved and rounded, falling back
+    to the integer program only when the rounded plan violates a constraint. This
+    trades optimality for speed: a rounded plan is feasible and near-optimal but can
+    cost slightly more than the integer optimum, so it is reported with status
+    "Feasible" unless its cost matches the relaxation's lower bound.
+    Callers that only need the plans can skip the recommendations, scenarioAnalysis
+    and kpis keys with include_analytics=False.
     """
     try:
+        skus = _normalize_skus(sku_data, scenario)
+        factories = _normalize_constraints(production_constraints)
+        sku_ids = skus.sku_ids.tolist()
+        factory_names = factories.factory.tolist()
+        
+        # Per (sku, factory) production cost, falling back to the SKU's unit cost
+        production_cost = np.where(
+            np.isnan(factories.production_cost_per_unit), skus.unit_cost[:, None], factories.production_cost_per_unit
+        )
+        holding_cost = (skus.unit_cost * skus.holding_rate).tolist()
+        stockout_penalty = skus.stockout_penalty.tolist()
+        actual_demand = skus.actual_demand.tolist()
+        current_stock = skus.current_stock.tolist()
+        
+        # A single factory needs no solver
+        if len(factory_names) == 1 and sku_ids:
+            solution = _closed_form_single_factory(skus, factories, scenario)
+            if solution is None:
+                return optimization_failed("Infeasible")
+            allocations, inventory, total_cost_value = solution
+            return inventory_result(
+                sku_ids, factory_names, allocations, inventory, current_stock, total_cost_value, scenario, include_analytics
+            )
+        
+        prod_keys = production_keys(sku_ids, factory_names)
+        
         # Create optimization model
         model = pulp.LpProblem("Supply_Chain_Optimization", pulp.LpMinimize)
         
-        # Decision variables
-        production_vars = {}
-        inventory_vars = {}
-        transport_vars = {}
+        # Decision variables: production as a (sku, factory) matrix of variable handles
+        production_mat = np.empty((len(sku_ids), len(factory_names)), dtype=object)
+        inventory_vars = np.empty(len(sku_ids), dtype=object)
+        
+        # The model is assembled from (variable, coefficient) pairs: each expression and
+        # constraint is built in one pass instead of through PuLP's operator overloads,
+        # which allocate an intermediate LpAffineExpression for every * and +.
+        # One sweep over (sku, factory) creates the variables and every term; constraints
+        # are added afterwards, family by family.
+        var_cat = pulp.LpContinuous if use_lp_relaxation else pulp.LpInteger
+        shortage_vars = []
+        shortage_rows, demand_rows, balance_rows = [], [], []
+        sku_rows = []
         
-        # Initialize decision variables
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            warehouse = sku.warehouse if hasattr(sku, 'warehouse') else sku.get('warehouse', 'Delhi')
+        for i, (sku_id, sku_keys, demand, stock, adjusted_demand, min_production) in enumerate(zip(
+            sku_ids, prod_keys, actual_demand, current_stock, skus.adjusted_demand.tolist(), skus.min_production.tolist()
+        )):
+            # Inventory variables
+            inv_var = inventory_vars[i] = pulp.LpVariable(
+                f"inv_{sku_id}", lowBound=0, cat=var_cat
+            )
             
             # Production variables for each factory
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                production_vars[f"{sku_id}_{factory}"] = pulp.LpVariable(
-                    f"prod_{sku_id}_{factory}", lowBound=0, cat='Integer'
-                )
+            sku_production = [pulp.LpVariable("prod_" + key, lowBound=0, cat=var_cat) for key in sku_keys]
+            production_mat[i] = sku_production
             
-            # Inventory variables
-            inventory_vars[sku_id] = pulp.LpVariable(
-                f"inv_{sku_id}", lowBound=0, cat='Integer'
-            )
+            # Stockout penalties: shortage >= actual_demand - inventory
+            shortage_var = pulp.LpVariable(f"shortage_{sku_id}", lowBound=0, cat=var_cat)
+            shortage_rows.append(([(shortage_var, 1), (inv_var, 1)], demand))
+            shortage_vars.append(shortage_var)
             
-            # Transportation variables
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                transport_vars[f"{sku_id}_{factory}_{warehouse}"] = pulp.LpVariable(
-                    f"trans_{sku_id}_{factory}_{warehouse}", lowBound=0, cat='Integer'
-                )
-        
-        # Objective function: Minimize total cost
-        total_cost = []
-        
-        # Production costs
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            unit_cost = sku.unit_cost if hasattr(sku, 'unit_cost') else 10.0
+            # Production from all factories should meet 90% of the scenario-adjusted demand (service level minimum)
+            demand_rows.append(([(var, 1) for var in sku_production], min_production))
             
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                prod_cost = constraint.production_cost_per_unit if hasattr(constraint, 'production_cost_per_unit') else unit_cost
-                total_cost.append(production_vars[f"{sku_id}_{factory}"] * prod_cost)
-        
-        # Holding costs
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            holding_rate = sku.holding_cost_rate if hasattr(sku, 'holding_cost_rate') else 0.25
-            unit_cost = sku.unit_cost if hasattr(sku, 'unit_cost') else 10.0
-            total_cost.append(inventory_vars[sku_id] * unit_cost * holding_rate)
-        
-        # Stockout penalties
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            actual_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-            stockout_penalty = sku.stockout_penalty if hasattr(sku, 'stockout_penalty') else 50.0
+            # Inventory - Production = Current Stock - Demand
+            balance = [(inv_var, 1)]
+            balance.extend((var, -1) for var in sku_production)
+            balance_rows.append((balance, stock - adjusted_demand))
             
-            shortage_var = pulp.LpVariable(f"shortage_{sku_id}", lowBound=0, cat='Integer')
-            model += shortage_var >= actual_demand - inventory_vars[sku_id]
-            total_cost.append(shortage_var * stockout_penalty)
+            if use_lp_relaxation:
+                sku_rows.append((sku_production, inv_var, shortage_var, stock, adjusted_demand, demand))
         
-        model += pulp.lpSum(total_cost), "Total_Supply_Chain_Cost"
+        # Objective function: Minimize total cost (production, holding, stockout), zipped
+        # from parallel variable and coefficient vectors in row-major (sku, factory) order
+        objective_vars = chain(production_mat.ravel().tolist(), inventory_vars.tolist(), shortage_vars)
+        objective_costs = chain(production_cost.ravel().tolist(), holding_cost, stockout_penalty)
+        model.setObjective(pulp.LpAffineExpression(
+            zip(objective_vars, objective_costs), name="Total_Supply_Chain_Cost"
+        ))
         
         # Constraints
+        for terms, rhs in shortage_rows:
+            add_linear_constraint(model, terms, pulp.LpConstraintGE, rhs)
         
         # 1. Production capacity constraints
-        for constraint in production_constraints:
-            factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-            weekly_capacity = constraint.weekly_capacity if hasattr(constraint, 'weekly_capacity') else 100
-            
-            factory_production = []
-            for sku in sku_data:
-                sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-                factory_production.append(production_vars[f"{sku_id}_{factory}"])
-            
-            model += pulp.lpSum(factory_production) <= weekly_capacity * scenario.capacity_utilization_target
+        capacities = [capacity * scenario.capacity_utilization_target for capacity in factories.weekly_capacity.tolist()]
+        for j, capacity in enumerate(capacities):
+            add_linear_constraint(model, [(var, 1) for var in production_mat[:, j].tolist()], pulp.LpConstraintLE, capacity)
         
         # 2. Demand fulfillment constraints
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            actual_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-            
-            # Adjust demand based on scenario
-            adjusted_demand = actual_demand * scenario.demand_surge_factor
-            
-            # Production from all factories should meet demand
-            total_production = []
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                total_production.append(production_vars[f"{sku_id}_{factory}"])
-            
-            model += pulp.lpSum(total_production) >= adjusted_demand * 0.9  # 90% service level minimum
+        for terms, rhs in demand_rows:
+            add_linear_constraint(model, terms, pulp.LpConstraintGE, rhs)
         
         # 3. Inventory balance constraints
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            current_stock = sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0)
-            
-            # Inventory = Current Stock + Production - Demand
-            total_production = []
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                total_production.append(production_vars[f"{sku_id}_{factory}"])
-            
-            actual_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-            adjusted_demand = actual_demand * scenario.demand_surge_factor
-            
-            model += inventory_vars[sku_id] == current_stock + pulp.lpSum(total_production) - adjusted_demand
+        for terms, rhs in balance_rows:
+            add_linear_constraint(model, terms, pulp.LpConstraintEQ, rhs)
         
-        # Solve the model
-        solver = pulp.PULP_CBC_CMD(msg=0)
+        # Solve the model, seeded with the last solution for this catalog/scenario if enabled
+        start_key = warm_start_key(sku_ids, factory_names, scenario) if USE_WARM_START else None
+        warm_start = start_key is not None and apply_warm_start(model, _warm_starts.get(start_key))
+        solver = cbc_solver(warm_start)
         model.solve(solver)
         
+        # An infeasible relaxation means the integer program is infeasible too
+        rounded = False
+        integer_solve = not use_lp_relaxation
+        if use_lp_relaxation and model.status == pulp.LpStatusOptimal:
+            # The relaxed optimum bounds the integer optimum from below, so a rounded plan
+            # costing no more than it is optimal for the integer program as well
+            lower_bound = model.objective.value()
+            if round_relaxed_solution(model, sku_rows, capacities):
+                rounded = model.objective.value() > lower_bound + ROUNDING_TOLERANCE * max(1, abs(lower_bound))
+            else:
+                for var in model.variables():
+                    var.cat = pulp.LpInteger
+                model.solve(solver)
+                integer_solve = True
+        
         if model.status != pulp.LpStatusOptimal:
-            return {
-                "status": pulp.LpStatus[model.status],
-                "message": "Optimization failed",
-                "productionPlan": [],
-                "inventoryPlan": [],
-                "totalCost": 0
-            }
+            return optimization_failed(pulp.LpStatus[model.status])
         
-        # Extract results
-        production_plan = []
-        inventory_plan = []
-        total_cost_value = 0
+        if start_key is not None:
+            _warm_starts[start_key] = {var.name: var.varValue for var in model.variables()}
         
-        for sku in sku_data:
-            sku_id = sku.sku if hasattr(sku, 'sku') else sku['sku']
-            
-            # Production plan
-            factory_allocations = {}
-            for constraint in production_constraints:
-                factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-                allocation = int(production_vars[f"{sku_id}_{factory}"].varValue or 0)
-                factory_allocations[factory] = allocation
-            
-            production_plan.append({
-                "sku": sku_id,
-                "factoryAllocations": factory_allocations,
-                "totalProduction": sum(factory_allocations.values())
-            })
-            
-            # Inventory plan
-            optimal_inventory = int(inventory_vars[sku_id].varValue or 0)
-            inventory_plan.append({
-                "sku": sku_id,
-                "optimalInventory": optimal_inventory,
-                "currentStock": sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0),
-                "recommendation": "Increase" if optimal_inventory > (sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0)) else "Decrease"
-            })
+        # Extract results
+        allocations = variable_values(production_mat).tolist()
+        inventory = variable_values(inventory_vars).tolist()
         
-        total_cost_value = model.objective.value()
+        result = inventory_result(
+            sku_ids, factory_names, allocations, inventory, current_stock, model.objective.value(), scenario,
+            include_analytics
+        )
         
-        # Generate strategic recommendations
-        recommendations = generate_optimization_recommendations(production_plan, inventory_plan, scenario)
+        if rounded:
+            gap = (model.objective.value() - lower_bound) / max(1e-9, abs(model.objective.value()))
+            result["status"] = "Feasible"
+            result["message"] = f"Rounded LP relaxation; at most {gap:.2%} above the optimal cost"
+        # CBC reports a solve cut off by the time limit as optimal; sol_status tells them apart
+        elif model.sol_status == pulp.LpSolutionIntegerFeasible:
+            result["status"] = "Feasible"
+            result["message"] = f"Stopped at the {CBC_TIME_LIMIT}s time limit; best plan found, not proven optimal"
+        elif CBC_GAP_REL and integer_solve:
+            result["status"] = "Feasible"
+            result["message"] = f"Solved to within {CBC_GAP_REL:.2%} of optimal (CBC_GAP_REL)"
         
-        return {
-            "status": "Optimal",
-            "productionPlan": production_plan,
-            "inventoryPlan": inventory_plan,
-            "totalCost": round(total_cost_value, 2),
-            "recommendations": recommendations,
-            "scenarioAnalysis": analyze_scenario_impact(scenario),
-            "kpis": calculate_optimization_kpis(production_plan, inventory_plan)
-        }
+        return result
         
     except Exception as e:
         return {
@@ -232,29 +502,30 @@ def optimize_production_allocation(sku_data: List[Any], production_constraints:
         return {"message": "No production constraints provided"}
     
     # Calculate optimal allocation using capacity balancing
-    total_capacity = sum(
-        (c.weekly_capacity if hasattr(c, 'weekly_capacity') else 100) * capacity_target 
-        for c in production_constraints
-    )
+    factories = _normalize_constraints(production_constraints)
+    capacities = factories.weekly_capacity * capacity_target
+    total_capacity = capacities.sum().item()
     
-    total_demand = sum(
-        sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        for sku in sku_data
-    )
+    demand = _normalize_skus(sku_data).actual_demand
+    total_demand = demand.sum().item() if len(demand) else 0
     
-    allocation_plan = []
+    if total_capacity > 0:
+        allocations = capacities / total_capacity * total_demand
+    else:
+        allocations = np.zeros_like(capacities)
+    utilization = np.divide(allocations, capacities, out=np.zeros_like(capacities), where=capacities > 0) * 100
     
-    for constraint in production_constraints:
-        factory = constraint.factory_location if hasattr(constraint, 'factory_location') else 'Delhi'
-        factory_capacity = (constraint.weekly_capacity if hasattr(constraint, 'weekly_capacity') else 100) * capacity_target
-        factory_allocation = (factory_capacity / total_capacity) * total_demand if total_capacity > 0 else 0
-        
-        allocation_plan.append({
+    allocation_plan = [
+        {
             "factory": factory,
-            "allocatedDemand": round(factory_allocation),
-            "capacity": factory_capacity,
-            "utilizationRate": round((factory_allocation / factory_capacity * 100), 2) if factory_capacity > 0 else 0
-        })
+            "allocatedDemand": round(allocation),
+            "capacity": capacity,
+            "utilizationRate": round(rate, 2) if capacity > 0 else 0
+        }
+        for factory, allocation, capacity, rate in zip(
+            factories.factory.tolist(), allocations.tolist(), capacities.tolist(), utilization.tolist()
+        )
+    ]
     
     return {
         "allocationPlan": allocation_plan,
@@ -303,9 +574,12 @@ def analyze_scenario_impact(scenario: Any) -> Dict:
 
 def calculate_optimization_kpis(production_plan: List[Dict], inventory_plan: List[Dict]) -> Dict:
     """Calculate key performance indicators for the optimization"""
-    total_production = sum(p["totalProduction"] for p in production_plan)
-    total_optimal_inventory = sum(p["optimalInventory"] for p in inventory_plan)
-    total_current_stock = sum(p["currentStock"] for p in inventory_plan)
+    production = np.fromiter((p["totalProduction"] for p in production_plan), dtype=np.int64, count=len(production_plan))
+    optimal_inventory = np.fromiter((p["optimalInventory"] for p in inventory_plan), dtype=np.int64, count=len(inventory_plan))
+    current_stock = np.array([p["currentStock"] for p in inventory_plan])
+    total_production = int(production.sum())
+    total_optimal_inventory = int(optimal_inventory.sum())
+    total_current_stock = current_stock.sum().item() if len(current_stock) else 0
     
     return {
         "totalPlannedProduction": total_production,
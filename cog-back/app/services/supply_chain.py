@@ -1,93 +1,203 @@
+import os
+import threading
 import numpy as np
 import pandas as pd
 import pulp
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from scipy import stats
 from datetime import datetime, timedelta
+from types import MappingProxyType, SimpleNamespace
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from app.services.cache import memoize_by_payload
+from app.services.fastexpr import evaluate
+from app.services.jit import njit, prange, NUMBA_AVAILABLE
+from app.services.optimizer import add_linear_constraint
 
+# Safety stock only depends on the SKU payload and service level
+_safety_stock_cache = TTLCache(maxsize=64, ttl=300)
+
+# Stock status and recommended action by status code, from most to least urgent
+STOCK_STATUSES = np.array(['Critical', 'Reorder', 'Normal', 'Excess'], dtype=object)
+STOCK_ACTIONS = np.array([
+    'URGENT: Emergency replenishment required',
+    'Place order immediately',
+    'Monitor closely',
+    'Consider reducing stock levels'
+], dtype=object)
+CRITICAL_STATUS = 0
+REORDER_STATUS = 1
+EXCESS_STATUS = 3
+
+# Below this many SKUs the NumPy path beats calling into the JIT kernel
+JIT_MIN_ROWS = 1000
+
+def _normalize_skus(sku_data: List[Any]) -> SimpleNamespace:
+    """
+    Read every SKU field this module needs once, as arrays aligned with sku_data.
+    Accepts request structs/models or legacy camelCase dicts (with the legacy defaults).
+    """
+    rows = [
+        (sku.sku, sku.warehouse, getattr(sku, 'product_category', 'Unknown'), sku.actual_demand, sku.forecast_demand,
+         getattr(sku, 'lead_time_days', 7), sku.current_stock) if hasattr(sku, 'sku') else
+        (sku.get('sku', ''), sku.get('warehouse', 'Delhi'), 'Unknown', sku.get('actualDemand', 0),
+         sku.get('forecastDemand', 0), 7, sku.get('stock', 0))
+        for sku in sku_data
+    ]
+    sku_ids, warehouses, categories, actual_demand, forecast_demand, lead_time, current_stock = (
+        zip(*rows) if rows else ((),) * 7
+    )
+    return SimpleNamespace(
+        sku_ids=np.array(sku_ids, dtype=object),
+        warehouse=np.array(warehouses, dtype=object),
+        product_category=np.array(categories, dtype=object),
+        actual_demand=np.array(actual_demand),
+        forecast_demand=np.array(forecast_demand),
+        lead_time_days=np.array(lead_time),
+        current_stock=np.array(current_stock)
+    )
+
+def _normalize_suppliers(suppliers: List[Any]) -> SimpleNamespace:
+    """Supplier arrays aligned with suppliers; anything that isn't a supplier struct/model gets the legacy defaults"""
+    rows = [
+        (s.supplier_id, s.material_type, s.unit_price, s.moq, s.reliability_score, s.lead_time_days, s.quality_rating)
+        if hasattr(s, 'supplier_id') else
+        ('SUP001', 'general', 10.0, 100, 0.8, 7, 7.0)
+        for s in suppliers
+    ]
+    supplier_ids, material_types, unit_price, moq, reliability, lead_time, quality = zip(*rows) if rows else ((),) * 7
+    return SimpleNamespace(
+        supplier_id=np.array(supplier_ids, dtype=object),
+        material_type=np.array(material_types, dtype=object),
+        unit_price=np.array(unit_price, dtype=np.float64),
+        moq=np.array(moq),
+        reliability_score=np.array(reliability, dtype=np.float64),
+        lead_time_days=np.array(lead_time),
+        quality_rating=np.array(quality, dtype=np.float64)
+    )
+
+@lru_cache(maxsize=32)
+def service_level_z_score(service_level_target: float) -> float:
+    """Z-score for a service level; requests reuse a handful of levels, so the SciPy call is cached"""
+    return float(stats.norm.ppf(service_level_target))
+
+@memoize_by_payload(_safety_stock_cache)
 def calculate_safety_stock(sku_data: List[Any], service_level_target: float = 0.95) -> List[Dict]:
     """
     Calculate optimal safety stock levels using statistical methods
     """
-    safety_stocks = []
-    z_score = stats.norm.ppf(service_level_target)  # Z-score for service level
-    
-    for sku in sku_data:
-        sku_id = sku.sku if hasattr(sku, 'sku') else sku.get('sku', '')
-        actual_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        forecast_demand = sku.forecast_demand if hasattr(sku, 'forecast_demand') else sku.get('forecastDemand', 0)
-        lead_time = getattr(sku, 'lead_time_days', 7)
-        current_stock = sku.current_stock if hasattr(sku, 'current_stock') else sku.get('stock', 0)
-        
-        # Calculate demand variability
-        demand_variance = abs(actual_demand - forecast_demand)
-        demand_std = max(1, demand_variance)  # Minimum std deviation of 1
-        
-        # Safety stock formula: Z * σ * √L
-        lead_time_factor = np.sqrt(lead_time / 7)  # Normalize to weekly lead time
-        safety_stock_level = z_score * demand_std * lead_time_factor
+    if not sku_data:
+        return {
+            'safetyStockLevels': [],
+            'totalSafetyStock': 0,
+            'criticalItems': 0,
+            'serviceLevel': service_level_target,
+            'averageLeadTime': float('nan'),
+            'recommendations': generate_safety_stock_recommendations(np.zeros(len(STOCK_STATUSES), dtype=np.intp), 0)
+        }
+    
+    z_score = service_level_z_score(service_level_target)  # Z-score for service level
+    
+    skus = _normalize_skus(sku_data)
+    actual = skus.actual_demand
+    lead = skus.lead_time_days
+    current = skus.current_stock
+    
+    # Demand variability, with a minimum std deviation of 1
+    demand_std = np.maximum(1, np.abs(actual - skus.forecast_demand))
+    
+    if NUMBA_AVAILABLE and len(actual) > JIT_MIN_ROWS:
+        safety_stock_level, reorder_point, status = _safety_core(
+            demand_std.astype(np.float64), actual.astype(np.float64), lead.astype(np.float64),
+            current.astype(np.float64), z_score
+        )
+    else:
+        # Safety stock formula: Z * σ * √L, with L normalized to weekly lead time
+        columns = {'z': z_score, 'std': demand_std, 'lead': lead, 'actual': actual}
+        safety_stock_level = evaluate('z * std * sqrt(lead / 7.0)', columns)
         
         # Reorder point calculation
-        reorder_point = actual_demand * (lead_time / 7) + safety_stock_level
+        reorder_point = evaluate('actual * (lead / 7.0) + safety', {**columns, 'safety': safety_stock_level})
         
         # Stock status assessment
-        stock_status = assess_stock_status(current_stock, reorder_point, safety_stock_level)
-        
-        safety_stocks.append({
+        status = stock_status_codes(current, reorder_point, safety_stock_level)
+    
+    # Rounded once per column; whole units go out as ints
+    safety_levels = np.round(safety_stock_level, 0).astype(np.int64)
+    status_counts = np.bincount(status, minlength=len(STOCK_STATUSES))
+    safety_stocks = [
+        {
             'sku': sku_id,
-            'warehouse': sku.warehouse if hasattr(sku, 'warehouse') else sku.get('warehouse', 'Delhi'),
-            'currentStock': current_stock,
-            'safetyStockLevel': round(safety_stock_level, 0),
-            'reorderPoint': round(reorder_point, 0),
-            'demandStd': round(demand_std, 2),
-            'leadTimeDays': lead_time,
+            'warehouse': warehouse,
+            'currentStock': stock,
+            'safetyStockLevel': safety_level,
+            'reorderPoint': reorder,
+            'demandStd': std,
+            'leadTimeDays': days,
             'serviceLevel': service_level_target,
             'stockStatus': stock_status,
-            'recommendedAction': get_stock_recommendation(current_stock, reorder_point, safety_stock_level)
-        })
-    
-    # Calculate aggregate metrics
-    total_safety_stock = sum(item['safetyStockLevel'] for item in safety_stocks)
-    critical_items = [item for item in safety_stocks if item['stockStatus'] == 'Critical']
+            'recommendedAction': action
+        }
+        for sku_id, warehouse, stock, safety_level, reorder, std, days, stock_status, action in zip(
+            skus.sku_ids.tolist(), skus.warehouse.tolist(), current.tolist(), safety_levels.tolist(), np.round(reorder_point, 0).astype(np.int64).tolist(),
+            np.round(demand_std, 2).tolist(), lead.tolist(), STOCK_STATUSES[status].tolist(), STOCK_ACTIONS[status].tolist()
+        )
+    ]
     
     return {
         'safetyStockLevels': safety_stocks,
-        'totalSafetyStock': total_safety_stock,
-        'criticalItems': len(critical_items),
+        'totalSafetyStock': safety_levels.sum().item(),
+        'criticalItems': int(status_counts[CRITICAL_STATUS]),
         'serviceLevel': service_level_target,
-        'averageLeadTime': np.mean([item['leadTimeDays'] for item in safety_stocks]),
-        'recommendations': generate_safety_stock_recommendations(safety_stocks)
+        'averageLeadTime': np.mean(lead),
+        'recommendations': generate_safety_stock_recommendations(status_counts, len(safety_stocks))
     }
 
+def stock_status_codes(current_stock: np.ndarray, reorder_point: np.ndarray, safety_stock: np.ndarray) -> np.ndarray:
+    """Index into STOCK_STATUSES/STOCK_ACTIONS for each SKU, based on its safety stock and reorder point"""
+    return np.select(
+        [current_stock <= safety_stock, current_stock <= reorder_point, current_stock <= reorder_point * 1.5],
+        [0, 1, 2],
+        3
+    )
+
 def assess_stock_status(current_stock: float, reorder_point: float, safety_stock: float) -> str:
     """Assess stock status based on safety stock levels"""
-    if current_stock <= safety_stock:
-        return 'Critical'
-    elif current_stock <= reorder_point:
-        return 'Reorder'
-    elif current_stock <= reorder_point * 1.5:
-        return 'Normal'
-    else:
-        return 'Excess'
+    return STOCK_STATUSES[int(stock_status_codes(np.asarray(current_stock), reorder_point, safety_stock))]
 
 def get_stock_recommendation(current_stock: float, reorder_point: float, safety_stock: float) -> str:
     """Get stock management recommendation"""
-    if current_stock <= safety_stock:
-        return 'URGENT: Emergency replenishment required'
-    elif current_stock <= reorder_point:
-        return 'Place order immediately'
-    elif current_stock <= reorder_point * 1.5:
-        return 'Monitor closely'
-    else:
-        return 'Consider reducing stock levels'
+    return STOCK_ACTIONS[int(stock_status_codes(np.asarray(current_stock), reorder_point, safety_stock))]
+
+@njit(parallel=True, cache=True)
+def _safety_core(demand_std, actual, lead, current, z):
+    """Safety stock, reorder point and status code per SKU, computed as in calculate_safety_stock"""
+    n = actual.shape[0]
+    safety = np.empty(n)
+    reorder = np.empty(n)
+    status = np.empty(n, dtype=np.int8)
+    for i in prange(n):
+        lead_weeks = lead[i] / 7
+        safety[i] = z * demand_std[i] * np.sqrt(lead_weeks)
+        reorder[i] = actual[i] * lead_weeks + safety[i]
+        if current[i] <= safety[i]:
+            status[i] = 0
+        elif current[i] <= reorder[i]:
+            status[i] = 1
+        elif current[i] <= reorder[i] * 1.5:
+            status[i] = 2
+        else:
+            status[i] = 3
+    return safety, reorder, status
 
-def generate_safety_stock_recommendations(safety_stocks: List[Dict]) -> List[str]:
-    """Generate safety stock management recommendations"""
+def generate_safety_stock_recommendations(status_counts: np.ndarray, item_count: int) -> List[str]:
+    """Generate safety stock management recommendations from the number of items per status code"""
     recommendations = []
     
-    critical_count = len([s for s in safety_stocks if s['stockStatus'] == 'Critical'])
-    reorder_count = len([s for s in safety_stocks if s['stockStatus'] == 'Reorder'])
-    excess_count = len([s for s in safety_stocks if s['stockStatus'] == 'Excess'])
+    critical_count = int(status_counts[CRITICAL_STATUS])
+    reorder_count = int(status_counts[REORDER_STATUS])
+    excess_count = int(status_counts[EXCESS_STATUS])
     
     if critical_count > 0:
         recommendations.append(f"URGENT: {critical_count} items below safety stock - initiate emergency procurement")
@@ -95,7 +205,7 @@ def generate_safety_stock_recommendations(safety_stocks: List[Dict]) -> List[str
     if reorder_count > 0:
         recommendations.append(f"{reorder_count} items need reordering - place orders this week")
     
-    if excess_count > len(safety_stocks) * 0.3:
+    if excess_count > item_count * 0.3:
         recommendations.append("High excess inventory detected - review demand forecasts and reorder policies")
     
     recommendations.extend([
@@ -106,24 +216,56 @@ def generate_safety_stock_recommendations(safety_stocks: List[Dict]) -> List[str
     
     return recommendations
 
-def optimize_procurement(suppliers: List[Any], sku_data: List[Any], emergency_mode: bool = False) -> Dict:
+# Fastest available PuLP solver first: HiGHS solves in memory through its Python bindings,
+# HiGHS_CMD still beats CBC; CBC ships with PuLP. Commercial solvers are opt-in via solver=
+PROCUREMENT_SOLVERS = ('HiGHS', 'HiGHS_CMD', 'PULP_CBC_CMD')
+
+# Opt-in MIP starts for re-solves of a cached procurement model
+USE_WARM_START = os.getenv("PROCUREMENT_WARM_START", "0") == "1"
+
+@lru_cache(maxsize=2)
+def default_procurement_solver(warm_start: bool = False) -> pulp.LpSolver:
+    """First installed solver of PROCUREMENT_SOLVERS, looked up once (with and without MIP starts)"""
+    available = set(pulp.listSolvers(onlyAvailable=True))
+    for name in PROCUREMENT_SOLVERS:
+        if name in available:
+            return pulp.getSolver(name, msg=False, warmStart=warm_start)
+    return pulp.PULP_CBC_CMD(msg=0, warmStart=warm_start)
+
+def optimize_procurement(suppliers: List[Any], sku_data: List[Any], emergency_mode: bool = False,
+                         solver: Optional[pulp.LpSolver] = None) -> Dict:
     """
-    Optimize procurement decisions considering supplier reliability, MOQ, and costs
+    Optimize procurement decisions considering supplier reliability, MOQ, and costs.
+    The procurement model is solved with solver, or the fastest installed one.
     """
     if not suppliers:
         return {"message": "No supplier data provided"}
     
-    # Create procurement optimization model
-    procurement_plan = create_procurement_model(suppliers, sku_data, emergency_mode)
+    # Read suppliers and SKUs once for every analysis below
+    supplier_table = _normalize_suppliers(suppliers)
+    skus = _normalize_skus(sku_data)
     
-    # Supplier allocation optimization
-    supplier_allocation = optimize_supplier_allocation(suppliers, sku_data)
+    # Map SKUs to required materials (simplified mapping), shared by the model and the MOQ analysis
+    material_requirements = calculate_material_requirements_for_skus(skus)
     
-    # MOQ optimization
-    moq_optimization = optimize_moq_decisions(suppliers, sku_data)
-    
-    # Risk assessment
-    supply_risk_assessment = assess_supply_risks(suppliers, sku_data)
+    # The LP solve mostly waits on the solver (a subprocess or native code that releases the GIL),
+    # so it runs on its own thread while the independent analyses below are computed
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Create procurement optimization model
+        plan_future = pool.submit(
+            create_procurement_model, supplier_table, skus, emergency_mode, material_requirements, solver
+        )
+        
+        # Supplier allocation optimization
+        supplier_allocation = optimize_supplier_allocation(supplier_table, skus)
+        
+        # MOQ optimization
+        moq_optimization = optimize_moq_decisions(supplier_table, skus, material_requirements)
+        
+        # Risk assessment
+        supply_risk_assessment = assess_supply_risks(supplier_table, skus)
+        
+        procurement_plan = plan_future.result()
     
     return {
         'procurementPlan': procurement_plan,
@@ -131,115 +273,133 @@ def optimize_procurement(suppliers: List[Any], sku_data: List[Any], emergency_mo
         'moqOptimization': moq_optimization,
         'riskAssessment': supply_risk_assessment,
         'totalProcurementCost': calculate_total_procurement_cost(procurement_plan),
-        'recommendations': generate_procurement_recommendations(suppliers, emergency_mode)
+        'recommendations': generate_procurement_recommendations(supplier_table, emergency_mode)
     }
 
-def create_procurement_model(suppliers: List[Any], sku_data: List[Any], emergency_mode: bool) -> Dict:
-    """Create linear programming model for procurement optimization"""
-    try:
-        # Create LP model
-        model = pulp.LpProblem("Procurement_Optimization", pulp.LpMinimize)
+@lru_cache(maxsize=4)
+def procurement_template(supplier_rows: Tuple, materials: Tuple[str, ...], emergency_mode: bool) -> SimpleNamespace:
+    """
+    Procurement model for (supplier_id, material_type, unit_price, moq, reliability) rows and the
+    materials to source (in MATERIALS order), with every demand right-hand side left at 0.
+    Requests for the same suppliers and materials only differ in those, so the model is built
+    once and reused.
+    """
+    # Create LP model
+    model = pulp.LpProblem("Procurement_Optimization", pulp.LpMinimize)
+    
+    # One pass over the suppliers creates the decision variables (quantity to order from each
+    # supplier for each material), their cost coefficients and every constraint row; rows are
+    # added to the model afterwards, family by family
+    order_vars: Dict[Tuple[str, str], pulp.LpVariable] = {}
+    supplier_vars = []
+    unit_costs = {}
+    material_supply = {}
+    moq_rows = []
+    unreliable_vars = []
+    
+    for supplier_id, material_type, unit_price, moq, reliability in supplier_rows:
+        # Tuple keys: no joined string to format and hash unless a variable is created
+        order_var = order_vars.get((supplier_id, material_type))
+        if order_var is None:
+            order_var = order_vars[supplier_id, material_type] = pulp.LpVariable(
+                f"order_{supplier_id}_{material_type}", lowBound=0, cat='Integer'
+            )
+        supplier_vars.append(order_var)
         
-        # Decision variables: quantity to order from each supplier for each material
-        order_vars = {}
+        # Objective: base cost, plus a 20% premium in emergency mode
+        unit_costs[order_var] = unit_costs.get(order_var, 0) + unit_price
+        if emergency_mode:
+            unit_costs[order_var] += unit_price * 0.2
         
-        # Map SKUs to required materials (simplified mapping)
-        material_requirements = calculate_material_requirements_for_skus(sku_data)
+        supply = material_supply.setdefault(material_type, {})
+        supply[order_var] = supply.get(order_var, 0) + 1
         
-        # Create decision variables
-        for supplier in suppliers:
-            supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-            material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-            
-            order_vars[f"{supplier_id}_{material_type}"] = pulp.LpVariable(
-                f"order_{supplier_id}_{material_type}", 
-                lowBound=0, 
-                cat='Integer'
+        # Binary variable for ordering decision
+        moq_rows.append((order_var, pulp.LpVariable(f"decision_{supplier_id}_{material_type}", cat='Binary'), moq))
+        
+        # In emergency mode, prefer reliable suppliers
+        if emergency_mode and reliability < 0.7:
+            unreliable_vars.append(order_var)
+    
+    # Objective function: minimize total cost, one coefficient per order variable
+    model.setObjective(pulp.LpAffineExpression(unit_costs, name="Total_Procurement_Cost"))
+    
+    # Constraints
+    
+    # 1. Material demand constraints, kept by material so each request can set its demand
+    demand_constraints = {}
+    for material in materials:
+        if material in material_supply:
+            constraint = pulp.LpConstraint(
+                pulp.LpAffineExpression(material_supply[material].items()), pulp.LpConstraintGE, rhs=0
             )
+            model.addConstraint(constraint)
+            demand_constraints[material] = constraint
+    
+    # 2. MOQ constraints: if we order, must be at least MOQ
+    for order_var, order_decision, moq in moq_rows:
+        add_linear_constraint(model, [(order_var, 1), (order_decision, -moq)], pulp.LpConstraintGE, 0)
+        add_linear_constraint(model, [(order_var, 1), (order_decision, -10000)], pulp.LpConstraintLE, 0)  # Upper bound
+    
+    # 3. Supplier reliability constraints: limit orders from unreliable suppliers
+    for order_var in unreliable_vars:
+        model += order_var <= 500
+    
+    return SimpleNamespace(
+        model=model, supplier_vars=supplier_vars, demand_constraints=demand_constraints,
+        lock=threading.Lock(), solved=False
+    )
+
+def create_procurement_model(suppliers: SimpleNamespace, skus: SimpleNamespace, emergency_mode: bool,
+                             material_requirements: Optional[Dict[str, float]] = None,
+                             solver: Optional[pulp.LpSolver] = None) -> Dict:
+    """Create linear programming model for procurement optimization"""
+    try:
+        supplier_ids = suppliers.supplier_id.tolist()
+        material_types = suppliers.material_type.tolist()
+        unit_prices = suppliers.unit_price.tolist()
+        reliabilities = suppliers.reliability_score.tolist()
         
-        # Objective function: minimize total cost
-        total_cost = []
+        # Map SKUs to required materials (simplified mapping)
+        if material_requirements is None:
+            material_requirements = calculate_material_requirements_for_skus(skus)
+        
+        # Nothing to source: with non-negative prices the optimum is to order nothing
+        if not material_requirements:
+            return {
+                'status': 'Optimal',
+                'procurementOrders': [],
+                'totalCost': 0.0,
+                'emergencyMode': emergency_mode,
+                'orderCount': 0
+            }
+        
+        template = procurement_template(
+            tuple(zip(supplier_ids, material_types, unit_prices, suppliers.moq.tolist(), reliabilities)),
+            tuple(material for material in MATERIALS if material in material_requirements),
+            emergency_mode
+        )
+        model = template.model
         
-        for supplier in suppliers:
-            supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-            material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-            unit_price = supplier.unit_price if hasattr(supplier, 'unit_price') else 10.0
+        with template.lock:
+            for material, constraint in template.demand_constraints.items():
+                constraint.changeRHS(material_requirements[material])
             
-            var_key = f"{supplier_id}_{material_type}"
-            if var_key in order_vars:
-                # Base cost
-                total_cost.append(order_vars[var_key] * unit_price)
-                
-                # Emergency premium
-                if emergency_mode:
-                    emergency_premium = unit_price * 0.2  # 20% emergency premium
-                    total_cost.append(order_vars[var_key] * emergency_premium)
-        
-        model += pulp.lpSum(total_cost), "Total_Procurement_Cost"
-        
-        # Constraints
-        
-        # 1. Material demand constraints
-        for material, required_qty in material_requirements.items():
-            material_supply = []
-            for supplier in suppliers:
-                supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-                supplier_material = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-                
-                if supplier_material == material:
-                    var_key = f"{supplier_id}_{material}"
-                    if var_key in order_vars:
-                        material_supply.append(order_vars[var_key])
+            # Solve the model; a reused template can start from its previous solution
+            model.solve(solver or default_procurement_solver(USE_WARM_START and template.solved))
+            template.solved = True
             
-            if material_supply:
-                model += pulp.lpSum(material_supply) >= required_qty
-        
-        # 2. MOQ constraints
-        for supplier in suppliers:
-            supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-            material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-            moq = supplier.moq if hasattr(supplier, 'moq') else 100
+            # Extract results
+            procurement_orders = []
+            total_cost_value = 0
             
-            var_key = f"{supplier_id}_{material_type}"
-            if var_key in order_vars:
-                # Binary variable for ordering decision
-                order_decision = pulp.LpVariable(f"decision_{supplier_id}_{material_type}", cat='Binary')
-                
-                # If we order, must be at least MOQ
-                model += order_vars[var_key] >= moq * order_decision
-                model += order_vars[var_key] <= 10000 * order_decision  # Upper bound
-        
-        # 3. Supplier reliability constraints (in emergency mode, prefer reliable suppliers)
-        if emergency_mode:
-            for supplier in suppliers:
-                reliability = supplier.reliability_score if hasattr(supplier, 'reliability_score') else 0.8
-                if reliability < 0.7:  # Penalize unreliable suppliers in emergency
-                    supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-                    material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-                    var_key = f"{supplier_id}_{material_type}"
-                    
-                    if var_key in order_vars:
-                        # Limit orders from unreliable suppliers
-                        model += order_vars[var_key] <= 500
-        
-        # Solve the model
-        solver = pulp.PULP_CBC_CMD(msg=0)
-        model.solve(solver)
-        
-        # Extract results
-        procurement_orders = []
-        total_cost_value = 0
-        
-        if model.status == pulp.LpStatusOptimal:
-            for supplier in suppliers:
-                supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-                material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-                var_key = f"{supplier_id}_{material_type}"
-                
-                if var_key in order_vars:
-                    order_qty = int(order_vars[var_key].varValue or 0)
+            if model.status == pulp.LpStatusOptimal:
+                for order_var, supplier_id, material_type, unit_price, lead_time, reliability in zip(
+                    template.supplier_vars, supplier_ids, material_types, unit_prices,
+                    suppliers.lead_time_days.tolist(), reliabilities
+                ):
+                    order_qty = int(order_var.varValue or 0)
                     if order_qty > 0:
-                        unit_price = supplier.unit_price if hasattr(supplier, 'unit_price') else 10.0
                         order_cost = order_qty * unit_price
                         total_cost_value += order_cost
                         
@@ -249,14 +409,16 @@ def create_procurement_model(suppliers: List[Any], sku_data: List[Any], emergenc
                             'orderQuantity': order_qty,
                             'unitPrice': unit_price,
                             'totalCost': order_cost,
-                            'leadTime': getattr(supplier, 'lead_time_days', 7),
-                            'reliability': getattr(supplier, 'reliability_score', 0.8)
+                            'leadTime': lead_time,
+                            'reliability': reliability
                         })
+                
+                total_cost_value = model.objective.value()
             
-            total_cost_value = model.objective.value()
+            status = pulp.LpStatus[model.status]
         
         return {
-            'status': pulp.LpStatus[model.status],
+            'status': status,
             'procurementOrders': procurement_orders,
             'totalCost': round(total_cost_value, 2),
             'emergencyMode': emergency_mode,
@@ -271,67 +433,77 @@ def create_procurement_model(suppliers: List[Any], sku_data: List[Any], emergenc
             'totalCost': 0
         }
 
-def calculate_material_requirements_for_skus(sku_data: List[Any]) -> Dict[str, float]:
-    """Calculate material requirements based on SKU demand"""
-    material_requirements = {}
-    
-    # Simplified material mapping (would be more detailed in real implementation)
-    sku_to_material = {
-        'Snacks': {'flour': 0.6, 'oil': 0.2, 'seasoning': 0.1, 'packaging': 0.1},
-        'Beverages': {'water': 0.8, 'concentrate': 0.15, 'packaging': 0.05},
-        'Unknown': {'raw_material': 0.7, 'packaging': 0.3}
+# Simplified material mapping (would be more detailed in real implementation)
+SKU_TO_MATERIAL = MappingProxyType({
+    'Snacks': {'flour': 0.6, 'oil': 0.2, 'seasoning': 0.1, 'packaging': 0.1},
+    'Beverages': {'water': 0.8, 'concentrate': 0.15, 'packaging': 0.05},
+    'Unknown': {'raw_material': 0.7, 'packaging': 0.3}
+})
+CATEGORIES = tuple(SKU_TO_MATERIAL)
+UNKNOWN_CATEGORY = CATEGORIES.index('Unknown')
+MATERIALS = tuple(dict.fromkeys(material for ratios in SKU_TO_MATERIAL.values() for material in ratios))
+# Material ratio per unit of demand, (category, material)
+RATIO_MATRIX = np.array([[ratios.get(material, 0.0) for material in MATERIALS] for ratios in SKU_TO_MATERIAL.values()])
+_CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+
+def calculate_material_requirements_for_skus(skus: SimpleNamespace) -> Dict[str, float]:
+    """
+    Calculate material requirements based on SKU demand: each SKU's demand is spread over its
+    category's RATIO_MATRIX row. Only materials of categories present are returned, in order
+    of first appearance.
+    """
+    categories = skus.product_category.tolist()
+    category_idx = np.fromiter(
+        (_CATEGORY_INDEX.get(category, UNKNOWN_CATEGORY) for category in categories), dtype=np.intp, count=len(categories)
+    )
+    # bincount adds demand * ratio in SKU order, so totals match a running per-SKU sum bit for bit
+    # (summing demand per category first and then scaling rounds differently)
+    sku_materials = np.asarray(skus.actual_demand, dtype=np.float64)[:, None] * RATIO_MATRIX[category_idx]
+    material_idx = np.broadcast_to(np.arange(len(MATERIALS)), sku_materials.shape)
+    totals = np.bincount(material_idx.ravel(), weights=sku_materials.ravel(), minlength=len(MATERIALS))
+    material_totals = dict(zip(MATERIALS, totals.tolist()))
+    
+    _, first_seen = np.unique(category_idx, return_index=True)
+    return {
+        material: material_totals[material]
+        for category in category_idx[np.sort(first_seen)].tolist()
+        for material in SKU_TO_MATERIAL[CATEGORIES[category]]
     }
-    
-    for sku in sku_data:
-        actual_demand = sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)
-        category = getattr(sku, 'product_category', 'Unknown')
-        
-        if category in sku_to_material:
-            materials = sku_to_material[category]
-        else:
-            materials = sku_to_material['Unknown']
-        
-        for material, ratio in materials.items():
-            if material not in material_requirements:
-                material_requirements[material] = 0
-            material_requirements[material] += actual_demand * ratio
-    
-    return material_requirements
 
-def optimize_supplier_allocation(suppliers: List[Any], sku_data: List[Any]) -> Dict:
+def optimize_supplier_allocation(suppliers: SimpleNamespace, skus: SimpleNamespace) -> Dict:
     """Optimize allocation across suppliers"""
-    if not suppliers:
+    if not len(suppliers.supplier_id):
         return {"message": "No suppliers available"}
     
-    # Calculate supplier scores
-    supplier_scores = []
-    for supplier in suppliers:
-        reliability = supplier.reliability_score if hasattr(supplier, 'reliability_score') else 0.8
-        quality = supplier.quality_rating if hasattr(supplier, 'quality_rating') else 7.0
-        price_score = 1 / (supplier.unit_price if hasattr(supplier, 'unit_price') else 10.0)
-        lead_time_score = 1 / (supplier.lead_time_days if hasattr(supplier, 'lead_time_days') else 7)
-        
-        # Weighted scoring
-        overall_score = (
-            reliability * 0.3 +
-            (quality / 10) * 0.25 +
-            price_score * 0.25 +
-            lead_time_score * 0.2
-        )
-        
-        supplier_scores.append({
-            'supplierId': supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001',
-            'materialType': supplier.material_type if hasattr(supplier, 'material_type') else 'general',
-            'overallScore': round(overall_score, 3),
+    # Weighted scoring of every supplier at once; a free supplier scores as if priced at 1e-9
+    overall_score = evaluate('reliability * 0.3 + (quality / 10) * 0.25 + (1 / price) * 0.25 + (1 / lead) * 0.2', {
+        'reliability': suppliers.reliability_score,
+        'quality': suppliers.quality_rating,
+        'price': np.maximum(suppliers.unit_price, 1e-9),
+        'lead': np.maximum(suppliers.lead_time_days, 1).astype(np.float64)
+    })
+    overall_score = np.round(overall_score, 3)
+    
+    # Rank by score, keeping input order among ties
+    ranking = np.argsort(-overall_score, kind='stable')
+    supplier_scores = [
+        {
+            'supplierId': supplier_id,
+            'materialType': material_type,
+            'overallScore': score,
             'reliability': reliability,
             'quality': quality,
-            'unitPrice': supplier.unit_price if hasattr(supplier, 'unit_price') else 10.0,
-            'leadTime': supplier.lead_time_days if hasattr(supplier, 'lead_time_days') else 7,
-            'moq': supplier.moq if hasattr(supplier, 'moq') else 100
-        })
-    
-    # Sort by score
-    supplier_scores.sort(key=lambda x: x['overallScore'], reverse=True)
+            'unitPrice': unit_price,
+            'leadTime': lead_time,
+            'moq': moq
+        }
+        for supplier_id, material_type, score, reliability, quality, unit_price, lead_time, moq in zip(
+            suppliers.supplier_id[ranking].tolist(), suppliers.material_type[ranking].tolist(),
+            overall_score[ranking].tolist(), suppliers.reliability_score[ranking].tolist(),
+            suppliers.quality_rating[ranking].tolist(), suppliers.unit_price[ranking].tolist(),
+            suppliers.lead_time_days[ranking].tolist(), suppliers.moq[ranking].tolist()
+        )
+    ]
     
     # Allocation strategy
     primary_suppliers = supplier_scores[:2]  # Top 2 suppliers
@@ -342,63 +514,74 @@ def optimize_supplier_allocation(suppliers: List[Any], sku_data: List[Any]) -> D
         'primarySuppliers': primary_suppliers,
         'backupSuppliers': backup_suppliers,
         'allocationStrategy': '80-20 rule: 80% from primary, 20% from backup',
-        'diversificationLevel': len(set(s['materialType'] for s in supplier_scores))
+        'diversificationLevel': len(set(suppliers.material_type.tolist()))
     }
 
-def optimize_moq_decisions(suppliers: List[Any], sku_data: List[Any]) -> Dict:
+def optimize_moq_decisions(suppliers: SimpleNamespace, skus: SimpleNamespace,
+                           material_requirements: Optional[Dict[str, float]] = None) -> Dict:
     """Optimize MOQ decisions to minimize total cost"""
-    moq_analysis = []
-    
     # Calculate total material requirements
-    material_requirements = calculate_material_requirements_for_skus(sku_data)
-    
-    for supplier in suppliers:
-        supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-        material_type = supplier.material_type if hasattr(supplier, 'material_type') else 'general'
-        moq = supplier.moq if hasattr(supplier, 'moq') else 100
-        unit_price = supplier.unit_price if hasattr(supplier, 'unit_price') else 10.0
-        
-        required_qty = material_requirements.get(material_type, 0)
-        
-        if required_qty > 0:
-            # Calculate optimal order quantity
-            if required_qty <= moq:
-                # Must order MOQ
-                order_qty = moq
-                excess_qty = moq - required_qty
-                holding_cost = excess_qty * unit_price * 0.25  # 25% holding cost rate
-            else:
-                # Order exact requirement or round up to MOQ multiples
-                moq_multiplier = np.ceil(required_qty / moq)
-                order_qty = moq_multiplier * moq
-                excess_qty = order_qty - required_qty
-                holding_cost = excess_qty * unit_price * 0.25
-            
-            total_cost = order_qty * unit_price + holding_cost
-            
-            moq_analysis.append({
-                'supplierId': supplier_id,
-                'materialType': material_type,
-                'requiredQty': required_qty,
-                'moq': moq,
-                'recommendedOrderQty': int(order_qty),
-                'excessQty': int(excess_qty),
-                'unitPrice': unit_price,
-                'totalCost': round(total_cost, 2),
-                'holdingCost': round(holding_cost, 2),
-                'costEfficiency': round(required_qty / order_qty, 3)  # Efficiency ratio
-            })
-    
-    # Sort by cost efficiency
-    moq_analysis.sort(key=lambda x: x['costEfficiency'], reverse=True)
+    if material_requirements is None:
+        material_requirements = calculate_material_requirements_for_skus(skus)
+    
+    # Suppliers of a required material only
+    required_qty = np.array(
+        [material_requirements.get(material, 0) for material in suppliers.material_type.tolist()], dtype=np.float64
+    )
+    rows = np.flatnonzero(required_qty > 0)
+    required_qty = required_qty[rows]
+    moq = suppliers.moq[rows]
+    unit_price = suppliers.unit_price[rows]
+    
+    # Must order at least the MOQ, otherwise the requirement rounded up to MOQ multiples
+    moq_multiple = required_qty > moq
+    order_qty = np.where(moq_multiple, np.ceil(required_qty / np.maximum(moq, 1)) * moq, moq)
+    excess_qty = order_qty - required_qty
+    holding_cost = excess_qty * unit_price * 0.25  # 25% holding cost rate
+    total_cost = order_qty * unit_price + holding_cost
+    cost_efficiency = np.array(_round_like_scalars(required_qty / order_qty, 3, moq_multiple))  # Efficiency ratio
+    
+    # Sort by cost efficiency, keeping supplier order among ties
+    ranking = np.argsort(-cost_efficiency, kind='stable')
+    total_costs = _round_like_scalars(total_cost[ranking], 2, moq_multiple[ranking])
+    excess_units = excess_qty[ranking].astype(np.int64).tolist()
+    moq_analysis = [
+        {
+            'supplierId': supplier_id,
+            'materialType': material_type,
+            'requiredQty': required,
+            'moq': supplier_moq,
+            'recommendedOrderQty': order,
+            'excessQty': excess,
+            'unitPrice': price,
+            'totalCost': cost,
+            'holdingCost': holding,
+            'costEfficiency': efficiency
+        }
+        for supplier_id, material_type, required, supplier_moq, order, excess, price, cost, holding, efficiency in zip(
+            suppliers.supplier_id[rows[ranking]].tolist(), suppliers.material_type[rows[ranking]].tolist(),
+            required_qty[ranking].tolist(), moq[ranking].tolist(), order_qty[ranking].astype(np.int64).tolist(),
+            excess_units, unit_price[ranking].tolist(), total_costs,
+            _round_like_scalars(holding_cost[ranking], 2, moq_multiple[ranking]),
+            cost_efficiency[ranking].tolist()
+        )
+    ]
     
     return {
         'moqAnalysis': moq_analysis,
-        'totalOptimalCost': sum(item['totalCost'] for item in moq_analysis),
-        'totalExcessInventory': sum(item['excessQty'] for item in moq_analysis),
+        'totalOptimalCost': sum(total_costs),
+        'totalExcessInventory': sum(excess_units),
         'recommendations': generate_moq_recommendations(moq_analysis)
     }
 
+def _round_like_scalars(values: np.ndarray, ndigits: int, numpy_rounded: np.ndarray) -> List[float]:
+    """
+    round() as the per-supplier loop applied it: MOQ-multiple rows went through np.ceil and were
+    rounded as np.float64 (numpy's rounding), the others as Python floats (correctly rounded).
+    """
+    python_rounded = np.array([round(value, ndigits) for value in values.tolist()], dtype=np.float64)
+    return np.where(numpy_rounded, np.round(values, ndigits), python_rounded).tolist()
+
 def generate_moq_recommendations(moq_analysis: List[Dict]) -> List[str]:
     """Generate MOQ optimization recommendations"""
     recommendations = []
@@ -420,72 +603,76 @@ def generate_moq_recommendations(moq_analysis: List[Dict]) -> List[str]:
     
     return recommendations
 
-def assess_supply_risks(suppliers: List[Any], sku_data: List[Any]) -> Dict:
+# Supplier risk level and mitigation actions by risk code ({} is the supplier id)
+RISK_LEVELS = np.array(['Low', 'Medium', 'High'], dtype=object)
+MEDIUM_RISK = 1
+HIGH_RISK = 2
+RISK_MITIGATION_ACTIONS = (
+    (
+        "Continue current relationship with {}",
+        "Standard monitoring procedures"
+    ),
+    (
+        "Monitor {} performance closely",
+        "Maintain backup supplier relationships",
+        "Consider dual sourcing"
+    ),
+    (
+        "Develop alternative suppliers for {}",
+        "Increase safety stock for materials from this supplier",
+        "Implement more frequent supplier audits"
+    )
+)
+
+def assess_supply_risks(suppliers: SimpleNamespace, skus: SimpleNamespace) -> Dict:
     """Assess supply chain risks"""
-    risk_factors = []
-    
-    for supplier in suppliers:
-        supplier_id = supplier.supplier_id if hasattr(supplier, 'supplier_id') else 'SUP001'
-        reliability = supplier.reliability_score if hasattr(supplier, 'reliability_score') else 0.8
-        lead_time = supplier.lead_time_days if hasattr(supplier, 'lead_time_days') else 7
-        quality = supplier.quality_rating if hasattr(supplier, 'quality_rating') else 7.0
-        
-        # Risk scoring
-        reliability_risk = 1 - reliability
-        lead_time_risk = min(1.0, lead_time / 14)  # Normalize to 14 days max
-        quality_risk = max(0, (7 - quality) / 7)  # Quality below 7 is risky
-        
-        overall_risk = (reliability_risk * 0.4 + lead_time_risk * 0.3 + quality_risk * 0.3)
-        
-        risk_level = 'High' if overall_risk > 0.6 else 'Medium' if overall_risk > 0.3 else 'Low'
-        
-        risk_factors.append({
+    # Risk scoring
+    reliability_risk = 1 - suppliers.reliability_score
+    lead_time_risk = np.minimum(1.0, suppliers.lead_time_days / 14)  # Normalize to 14 days max
+    quality_risk = np.maximum(0, (7 - suppliers.quality_rating) / 7)  # Quality below 7 is risky
+    
+    overall_risk = reliability_risk * 0.4 + lead_time_risk * 0.3 + quality_risk * 0.3
+    risk_codes = risk_level_codes(overall_risk)
+    rounded_risk = np.round(overall_risk, 3)
+    high_count = int(np.count_nonzero(risk_codes == HIGH_RISK))
+    
+    risk_factors = [
+        {
             'supplierId': supplier_id,
-            'materialType': supplier.material_type if hasattr(supplier, 'material_type') else 'general',
-            'overallRisk': round(overall_risk, 3),
+            'materialType': material_type,
+            'overallRisk': overall,
             'riskLevel': risk_level,
-            'reliabilityRisk': round(reliability_risk, 3),
-            'leadTimeRisk': round(lead_time_risk, 3),
-            'qualityRisk': round(quality_risk, 3),
-            'mitigationActions': generate_risk_mitigation_actions(overall_risk, supplier_id)
-        })
-    
-    # Aggregate risk assessment
-    high_risk_suppliers = [r for r in risk_factors if r['riskLevel'] == 'High']
-    medium_risk_suppliers = [r for r in risk_factors if r['riskLevel'] == 'Medium']
+            'reliabilityRisk': reliability,
+            'leadTimeRisk': lead_time,
+            'qualityRisk': quality,
+            'mitigationActions': [action.format(supplier_id) for action in RISK_MITIGATION_ACTIONS[code]]
+        }
+        for supplier_id, material_type, overall, risk_level, code, reliability, lead_time, quality in zip(
+            suppliers.supplier_id.tolist(), suppliers.material_type.tolist(), rounded_risk.tolist(),
+            RISK_LEVELS[risk_codes].tolist(), risk_codes.tolist(), np.round(reliability_risk, 3).tolist(),
+            np.round(lead_time_risk, 3).tolist(), np.round(quality_risk, 3).tolist()
+        )
+    ]
     
     return {
         'riskFactors': risk_factors,
-        'highRiskSuppliers': len(high_risk_suppliers),
-        'mediumRiskSuppliers': len(medium_risk_suppliers),
-        'overallRiskLevel': assess_overall_supply_risk(risk_factors),
-        'criticalMaterials': identify_critical_materials(risk_factors, sku_data),
-        'recommendations': generate_supply_risk_recommendations(risk_factors)
+        'highRiskSuppliers': high_count,
+        'mediumRiskSuppliers': int(np.count_nonzero(risk_codes == MEDIUM_RISK)),
+        'overallRiskLevel': _assess_overall_supply_risk(
+            rounded_risk.mean() if len(risk_factors) else 0.0, high_count, len(risk_factors)
+        ),
+        'criticalMaterials': identify_critical_materials(risk_factors),
+        'recommendations': _supply_risk_recommendations(high_count)
     }
 
+def risk_level_codes(overall_risk: np.ndarray) -> np.ndarray:
+    """Index into RISK_LEVELS/RISK_MITIGATION_ACTIONS: High above 0.6, Medium above 0.3, else Low"""
+    return np.select([overall_risk > 0.6, overall_risk > 0.3], [HIGH_RISK, MEDIUM_RISK], 0)
+
 def generate_risk_mitigation_actions(risk_score: float, supplier_id: str) -> List[str]:
     """Generate risk mitigation actions for suppliers"""
-    actions = []
-    
-    if risk_score > 0.6:
-        actions.extend([
-            f"Develop alternative suppliers for {supplier_id}",
-            "Increase safety stock for materials from this supplier",
-            "Implement more frequent supplier audits"
-        ])
-    elif risk_score > 0.3:
-        actions.extend([
-            f"Monitor {supplier_id} performance closely",
-            "Maintain backup supplier relationships",
-            "Consider dual sourcing"
-        ])
-    else:
-        actions.extend([
-            f"Continue current relationship with {supplier_id}",
-            "Standard monitoring procedures"
-        ])
-    
-    return actions
+    code = int(risk_level_codes(np.asarray(risk_score)))
+    return [action.format(supplier_id) for action in RISK_MITIGATION_ACTIONS[code]]
 
 def assess_overall_supply_risk(risk_factors: List[Dict]) -> str:
     """Assess overall supply chain risk level"""
@@ -493,36 +680,33 @@ def assess_overall_supply_risk(risk_factors: List[Dict]) -> str:
         return 'Unknown'
     
     avg_risk = np.mean([r['overallRisk'] for r in risk_factors])
-    high_risk_count = len([r for r in risk_factors if r['riskLevel'] == 'High'])
+    high_risk_count = sum(r['riskLevel'] == 'High' for r in risk_factors)
+    return _assess_overall_supply_risk(avg_risk, high_risk_count, len(risk_factors))
+
+def _assess_overall_supply_risk(avg_risk: float, high_risk_count: int, supplier_count: int) -> str:
+    """Overall risk level from aggregates already computed over the supplier risk arrays"""
+    if not supplier_count:
+        return 'Unknown'
     
-    if avg_risk > 0.6 or high_risk_count > len(risk_factors) * 0.3:
+    if avg_risk > 0.6 or high_risk_count > supplier_count * 0.3:
         return 'High'
     elif avg_risk > 0.3 or high_risk_count > 0:
         return 'Medium'
     else:
         return 'Low'
 
-def identify_critical_materials(risk_factors: List[Dict], sku_data: List[Any]) -> List[str]:
-    """Identify materials critical to production"""
+def identify_critical_materials(risk_factors: List[Dict]) -> List[str]:
+    """Identify materials critical to production: those supplied by high-risk suppliers"""
     # Simplified - would be more complex in reality
-    high_risk_materials = [r['materialType'] for r in risk_factors if r['riskLevel'] == 'High']
-    
-    # Materials used in high-demand SKUs
-    high_demand_skus = [
-        sku for sku in sku_data 
-        if (sku.actual_demand if hasattr(sku, 'actual_demand') else sku.get('actualDemand', 0)) > 50
-    ]
-    
-    critical_materials = list(set(high_risk_materials))
-    
-    return critical_materials
+    return list({r['materialType'] for r in risk_factors if r['riskLevel'] == 'High'})
 
 def generate_supply_risk_recommendations(risk_factors: List[Dict]) -> List[str]:
     """Generate supply risk management recommendations"""
+    return _supply_risk_recommendations(sum(r['riskLevel'] == 'High' for r in risk_factors))
+
+def _supply_risk_recommendations(high_risk_count: int) -> List[str]:
     recommendations = []
     
-    high_risk_count = len([r for r in risk_factors if r['riskLevel'] == 'High'])
-    
     if high_risk_count > 0:
         recommendations.append(f"URGENT: Address {high_risk_count} high-risk suppliers immediately")
     
@@ -543,7 +727,7 @@ def calculate_total_procurement_cost(procurement_plan: Dict) -> float:
     
     return sum(order.get('totalCost', 0) for order in procurement_plan['procurementOrders'])
 
-def generate_procurement_recommendations(suppliers: List[Any], emergency_mode: bool) -> List[str]:
+def generate_procurement_recommendations(suppliers: SimpleNamespace, emergency_mode: bool) -> List[str]:
     """Generate procurement strategy recommendations"""
     recommendations = []
     
@@ -563,21 +747,15 @@ def generate_procurement_recommendations(suppliers: List[Any], emergency_mode: b
         ])
     
     # Supplier-specific recommendations
-    if suppliers:
-        avg_reliability = np.mean([
-            s.reliability_score if hasattr(s, 'reliability_score') else 0.8 
-            for s in suppliers
-        ])
+    if len(suppliers.supplier_id):
+        avg_reliability = np.mean(suppliers.reliability_score)
         
         if avg_reliability < 0.8:
             recommendations.append("Improve supplier reliability through development programs")
         
-        long_lead_time_suppliers = [
-            s for s in suppliers 
-            if (s.lead_time_days if hasattr(s, 'lead_time_days') else 7) > 10
-        ]
+        long_lead_time_suppliers = np.count_nonzero(suppliers.lead_time_days > 10)
         
         if long_lead_time_suppliers:
-            recommendations.append(f"Work with {len(long_lead_time_suppliers)} suppliers to reduce lead times")
+            recommendations.append(f"Work with {long_lead_time_suppliers} suppliers to reduce lead times")
     
     return recommendations